@@ -1,24 +1,32 @@
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.fft import ifft, fft
-from scipy.signal import windows, convolve, welch
-from scipy.io.wavfile import write, read
+from scipy.signal import windows
+from filtres.convolution import fir_filter
 
 # --- 1. Définition de la fonction de réponse en fréquence du filtre en cloche ---
 def bell_filter_frequency_response(frequencies, center_freq, Q_factor, gain_dB):
     """
-    Calcule la réponse en magnitude (en linéaire) d'un filtre en cloche.
+    Calcule la réponse en magnitude (en linéaire) d'un ou plusieurs filtres en cloche.
+
+    Les paramètres peuvent être des scalaires ou des tableaux de même taille
+    pour calculer plusieurs cloches en un seul appel.
 
     Args:
         frequencies (np.array): Tableau des fréquences en Hz.
-        center_freq (float): Fréquence centrale du filtre en Hz (f dans votre formule).
-        Q_factor (float): Facteur de qualité (q dans votre formule).
-        gain_dB (float): Gain maximal du filtre en décibels (g dans votre formule,
-                         représenté ici en dB pour être converti en linéaire).
+        center_freq (float | np.array): Fréquence centrale du filtre en Hz (f dans votre formule).
+        Q_factor (float | np.array): Facteur de qualité (q dans votre formule).
+        gain_dB (float | np.array): Gain maximal du filtre en décibels (g dans votre formule,
+                                    représenté ici en dB pour être converti en linéaire).
 
     Returns:
-        np.array: Réponse en magnitude linéaire pour chaque fréquence.
+        np.array: Réponse en magnitude linéaire pour chaque fréquence, de forme
+                  (fréquences,) pour des paramètres scalaires, (cloches, fréquences) sinon.
     """
+    # Les paramètres deviennent des colonnes pour être diffusés sur l'axe des fréquences
+    center_freq, Q_factor, gain_dB = (np.asarray(p, dtype=np.float64)[..., np.newaxis]
+                                      for p in (center_freq, Q_factor, gain_dB))
+
     # Convertir le gain de dB en linéaire pour 'g'
     g_linear = 10**(gain_dB / 20.0)
 
@@ -30,141 +38,177 @@ def bell_filter_frequency_response(frequencies, center_freq, Q_factor, gain_dB):
     term2 = np.log(2)
     term3 = (2 * (np.sinh(1 / (2 * Q_factor)))**2)
 
-    # Éviter la division par zéro si Q_factor est trop grand ou 1/(2Q) est proche de 0
-    # Dans ce cas, le dénominateur de sinh peut être très petit, gérant cela.
-    # Pour Q = inf, sinh(0) = 0. Nous mettons une petite valeur pour éviter inf ou NaN.
-    if np.abs(term3).any() < 1e-10:
-        term3 = np.where(np.abs(term3) < 1e-10, 1e-10, term3) # Remplace les valeurs très petites par 1e-10
+    # Éviter la division par zéro si Q_factor est trop grand ou 1/(2Q) est proche de 0 :
+    # pour Q = inf, sinh(0) = 0, on borne donc le dénominateur par une petite valeur.
+    term3 = np.maximum(np.abs(term3), 1e-10)
 
     exponent = -(term1 * term2) / term3
 
-    # Calcul de la réponse en magnitude
+    # Calcul de la réponse en magnitude, autour de 1 (0 dB hors de la cloche)
     magnitude_response = g_linear * np.exp(exponent)
-    for a in range(len(magnitude_response)):
-        magnitude_response[a] = magnitude_response[a]+1
+    magnitude_response += 1
     return magnitude_response
 
-# --- 2. Paramètres du signal et du filtre ---
-sample_rate = 44100  # Fréquence d'échantillonnage en Hz
-duration = 3         # Durée du signal audio en secondes
-num_samples = int(sample_rate * duration)
-
-# Paramètres de votre filtre en cloche
-center_freq = 1000   # Fréquence centrale de 1 kHz
-Q_factor = 10         # Facteur de qualité, plus élevé = cloche plus étroite
-gain_dB = 12         # Gain de 12 dB (boost)
-
-# Ordre du filtre FIR. Un ordre plus élevé = meilleure approximation de la réponse en fréquence
-# mais un calcul plus lourd. Choisissez une puissance de 2 pour l'IFFT pour l'efficacité.
-# Un ordre de 1024 ou 2048 est un bon point de départ pour une cloche.
-fir_order = 2048
-
-# --- 3. Génération de la réponse impulsionnelle du FIR ---
-
-# Créez un tableau de fréquences pour l'IFFT
-# La longueur de l'IFFT doit être au moins l'ordre du FIR
-fft_length = fir_order
-
-# Les fréquences s'étendent de 0 à sample_rate/2 (Nyquist)
-# et sont symétriques pour les fréquences négatives pour l'IFFT
-frequencies_for_fft = np.fft.fftfreq(fft_length, d=1/sample_rate)
-
-# Réponse en magnitude calculée par notre fonction
-magnitude_spectrum = bell_filter_frequency_response(
-    np.abs(frequencies_for_fft), center_freq, Q_factor, gain_dB
-)
-
-# Pour un FIR à phase linéaire, nous prenons une phase nulle (ou un délai constant)
-# La réponse en fréquence complexe est simplement la magnitude, car la phase est nulle pour un filtre idéal
-# (ou linéaire, mais pour la conception d'un FIR symétrique, on part de là).
-# Note: Pour des filtres FIR à phase linéaire, l'IFFT d'une réponse en magnitude réelle
-# donnera une réponse impulsionnelle symétrique autour du centre.
-complex_frequency_response = magnitude_spectrum
-
-# Appliquez l'IFFT pour obtenir la réponse impulsionnelle
-# Le résultat de l'IFFT peut être complexe, mais pour un filtre réel et à phase linéaire,
-# la partie imaginaire devrait être négligeable.
-ideal_impulse_response = np.real(ifft(complex_frequency_response))
-
-# Centrez la réponse impulsionnelle pour une phase linéaire (décalage circulaire)
-# Cela déplace le pic de la réponse impulsionnelle au milieu, ce qui correspond à un délai.
-ideal_impulse_response = np.roll(ideal_impulse_response, fft_length // 2)
-
-# Appliquez une fenêtre (par exemple, Blackman) pour réduire les artefacts de troncature
-# et obtenir les coefficients FIR finaux.
-window = windows.blackman(fir_order)
-fir_coefficients = ideal_impulse_response[:fir_order] * window
-
-# Normalisez les coefficients pour éviter un changement de volume global indésirable si le gain moyen n'est pas 1.
-# Cette étape est optionnelle et dépend de l'effet voulu. Pour un "boost", on ne normalise pas toujours
-# pour maintenir le gain_dB demandé. Cependant, si le gain moyen est trop élevé, ça peut saturer.
-#fir_coefficients /= np.sum(fir_coefficients) # Décommentez si vous voulez que le gain DC soit 0dB
-
-# --- 4. Génération d'un signal audio de test (bruit blanc) ---
-# Le bruit blanc est idéal pour tester la réponse en fréquence d'un filtre.
-test_audio = np.random.randn(num_samples).astype(np.float32)
-# Normalisation du bruit blanc pour éviter la saturation
-test_audio = 0.5 * test_audio / np.max(np.abs(test_audio))
-
-# --- 5. Application du filtre au signal audio ---
-print(f"Application du filtre FIR d'ordre {fir_order} par convolution...")
-filtered_audio = convolve(test_audio, fir_coefficients, mode='same')
-print("Filtrage terminé.")
-
-# Normalisation du signal filtré pour éviter le clipping lors de la lecture/écriture
-max_val = np.max(np.abs(filtered_audio))
-if max_val > 1.0:
-    filtered_audio = filtered_audio / max_val * 0.9 # Normalise à 90% de la plage max
-
-# --- 6. Sauvegarde et lecture du signal audio ---
-output_filename_original = "test_audio_original.wav"
-output_filename_filtered = "test_audio_filtered.wav"
-
-write(output_filename_original, sample_rate, (test_audio * 32767).astype(np.int16)) # Convertir en int16 pour WAV
-write(output_filename_filtered, sample_rate, (filtered_audio * 32767).astype(np.int16))
-
-print(f"Signal original sauvegardé sous : {output_filename_original}")
-print(f"Signal filtré sauvegardé sous : {output_filename_filtered}")
-
-# --- 7. Visualisation (Optionnel) ---
-plt.figure(figsize=(15, 10))
-
-# Spectre de la réponse impulsionnelle (pour vérifier la forme du filtre)
-plt.subplot(3, 1, 1)
-plt.plot(np.fft.fftfreq(fir_order, d=1/sample_rate)[:fir_order//2],
-         20 * np.log10(np.abs(fft(fir_coefficients))[:fir_order//2]))
-plt.title('Réponse en Fréquence du Filtre FIR (en dB)')
-plt.xlabel('Fréquence (Hz)')
-plt.ylabel('Gain (dB)')
-plt.grid(True)
-plt.axvline(center_freq, color='r', linestyle='--', label=f'Fréquence Centrale ({center_freq} Hz)')
-plt.legend()
-plt.xlim(20, sample_rate/2)
-plt.xscale('log')
-
-
-# Spectre du signal original et filtré
-# Utilisation de la méthode de Welch pour une estimation plus lisse du PSD
-f_orig, Pxx_orig = welch(test_audio, fs=sample_rate, nperseg=1024)
-f_filt, Pxx_filt = welch(filtered_audio, fs=sample_rate, nperseg=1024)
-
-plt.subplot(3, 1, 2)
-plt.semilogx(f_orig, 10 * np.log10(Pxx_orig), label='Original')
-plt.semilogx(f_filt, 10 * np.log10(Pxx_filt), label='Filtré')
-plt.title('Spectre de Puissance du Signal Audio (Original vs. Filtré)')
-plt.xlabel('Fréquence (Hz)')
-plt.ylabel('Densité Spectrale de Puissance (dB/Hz)')
-plt.grid(True)
-plt.legend()
-plt.xlim(20, sample_rate/2)
-
-# Affichage des coefficients du FIR
-plt.subplot(3, 1, 3)
-plt.plot(fir_coefficients)
-plt.title('Coefficients de la Réponse Impulsionnelle du FIR')
-plt.xlabel('Échantillon')
-plt.ylabel('Amplitude')
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+# --- 2. Conception des coefficients FIR, mise en cache ---
+def linear_phase_fir(magnitude_spectrum):
+    """
+    Calcule un FIR à phase linéaire à partir d'une réponse en magnitude.
+
+    Args:
+        magnitude_spectrum (np.array): Magnitude(s) linéaire(s) échantillonnée(s) sur
+                                       np.abs(np.fft.fftfreq(fir_order, 1/sample_rate)),
+                                       de forme (..., fir_order).
+
+    Returns:
+        np.array: Coefficients de forme (..., fir_order), en lecture seule.
+    """
+    fir_order = magnitude_spectrum.shape[-1]
+
+    # L'IFFT d'une magnitude réelle et symétrique donne une réponse impulsionnelle
+    # réelle (partie imaginaire négligeable), qu'on centre pour obtenir un délai constant.
+    ideal_impulse_response = np.real(ifft(magnitude_spectrum, axis=-1))
+    ideal_impulse_response = np.roll(ideal_impulse_response, fir_order // 2, axis=-1)
+
+    # Fenêtre de Blackman pour réduire les artefacts de troncature
+    fir_coefficients = ideal_impulse_response * windows.blackman(fir_order)
+    fir_coefficients.flags.writeable = False
+    return fir_coefficients
+
+@functools.lru_cache(maxsize=256)
+def _design_bell_firs(sample_rate, fir_order, center_freqs, Q_factors, gains_dB):
+    # Les fréquences s'étendent de 0 à sample_rate/2 (Nyquist)
+    # et sont symétriques pour les fréquences négatives pour l'IFFT
+    frequencies_for_fft = np.fft.fftfreq(fir_order, d=1/sample_rate)
+
+    # Réponse en magnitude de chaque cloche, une ligne par cloche. Pour un FIR à
+    # phase linéaire on part d'une phase nulle : la réponse complexe est la magnitude.
+    magnitude_spectrum = bell_filter_frequency_response(
+        np.abs(frequencies_for_fft), center_freqs, Q_factors, gains_dB
+    )
+
+    return linear_phase_fir(magnitude_spectrum)
+
+def design_bell_fir(sample_rate, center_freq, Q_factor, gain_dB, fir_order=2048):
+    """
+    Calcule les coefficients FIR à phase linéaire d'un ou plusieurs filtres en cloche.
+
+    Les conceptions sont mémorisées (LRU) par (sample_rate, fir_order, paramètres) :
+    revenir à des réglages déjà utilisés, par exemple lors d'une automation,
+    ne recalcule pas le filtre.
+
+    Args:
+        sample_rate (int): Fréquence d'échantillonnage en Hz.
+        center_freq (float | np.array): Fréquence(s) centrale(s) en Hz.
+        Q_factor (float | np.array): Facteur(s) de qualité.
+        gain_dB (float | np.array): Gain(s) en dB.
+        fir_order (int): Nombre de coefficients du FIR.
+
+    Returns:
+        np.array: Coefficients en lecture seule, (fir_order,) pour des paramètres
+                  scalaires ou (cloches, fir_order) pour des tableaux.
+    """
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=np.float64) for p in (center_freq, Q_factor, gain_dB)))
+    if params[0].ndim == 0:
+        return _design_bell_firs(float(sample_rate), int(fir_order), *(float(p) for p in params))
+    center_freqs, Q_factors, gains_dB = (tuple(p.ravel().tolist()) for p in params)
+    return _design_bell_firs(float(sample_rate), int(fir_order), center_freqs, Q_factors, gains_dB)
+
+def main():
+    # Les dépendances de la démo ne sont importées que lorsqu'elle est lancée
+    import matplotlib.pyplot as plt
+    from scipy.io.wavfile import write
+    from scipy.signal import welch
+
+    # --- 3. Paramètres du signal et du filtre ---
+    sample_rate = 44100  # Fréquence d'échantillonnage en Hz
+    duration = 3         # Durée du signal audio en secondes
+    num_samples = int(sample_rate * duration)
+
+    # Paramètres de votre filtre en cloche
+    center_freq = 1000   # Fréquence centrale de 1 kHz
+    Q_factor = 10         # Facteur de qualité, plus élevé = cloche plus étroite
+    gain_dB = 12         # Gain de 12 dB (boost)
+
+    # Ordre du filtre FIR. Un ordre plus élevé = meilleure approximation de la réponse en fréquence
+    # mais un calcul plus lourd. Choisissez une puissance de 2 pour l'IFFT pour l'efficacité.
+    # Un ordre de 1024 ou 2048 est un bon point de départ pour une cloche.
+    fir_order = 2048
+
+    fir_coefficients = design_bell_fir(sample_rate, center_freq, Q_factor, gain_dB, fir_order)
+
+    # Normalisez les coefficients pour éviter un changement de volume global indésirable si le gain moyen n'est pas 1.
+    # Cette étape est optionnelle et dépend de l'effet voulu. Pour un "boost", on ne normalise pas toujours
+    # pour maintenir le gain_dB demandé. Cependant, si le gain moyen est trop élevé, ça peut saturer.
+    #fir_coefficients = fir_coefficients / np.sum(fir_coefficients) # Décommentez si vous voulez que le gain DC soit 0dB
+
+    # --- 4. Génération d'un signal audio de test (bruit blanc) ---
+    # Le bruit blanc est idéal pour tester la réponse en fréquence d'un filtre.
+    test_audio = np.random.randn(num_samples).astype(np.float32)
+    # Normalisation du bruit blanc pour éviter la saturation
+    test_audio = 0.5 * test_audio / np.max(np.abs(test_audio))
+
+    # --- 5. Application du filtre au signal audio ---
+    print(f"Application du filtre FIR d'ordre {fir_order} par convolution partitionnée...")
+    filtered_audio = fir_filter(test_audio, fir_coefficients, mode='same', method='partitioned')
+    print("Filtrage terminé.")
+
+    # Normalisation du signal filtré pour éviter le clipping lors de la lecture/écriture
+    max_val = np.max(np.abs(filtered_audio))
+    if max_val > 1.0:
+        filtered_audio = filtered_audio / max_val * 0.9 # Normalise à 90% de la plage max
+
+    # --- 6. Sauvegarde et lecture du signal audio ---
+    output_filename_original = "test_audio_original.wav"
+    output_filename_filtered = "test_audio_filtered.wav"
+
+    write(output_filename_original, sample_rate, (test_audio * 32767).astype(np.int16)) # Convertir en int16 pour WAV
+    write(output_filename_filtered, sample_rate, (filtered_audio * 32767).astype(np.int16))
+
+    print(f"Signal original sauvegardé sous : {output_filename_original}")
+    print(f"Signal filtré sauvegardé sous : {output_filename_filtered}")
+
+    # --- 7. Visualisation (Optionnel) ---
+    plt.figure(figsize=(15, 10))
+
+    # Spectre de la réponse impulsionnelle (pour vérifier la forme du filtre)
+    plt.subplot(3, 1, 1)
+    plt.plot(np.fft.fftfreq(fir_order, d=1/sample_rate)[:fir_order//2],
+             20 * np.log10(np.abs(fft(fir_coefficients))[:fir_order//2]))
+    plt.title('Réponse en Fréquence du Filtre FIR (en dB)')
+    plt.xlabel('Fréquence (Hz)')
+    plt.ylabel('Gain (dB)')
+    plt.grid(True)
+    plt.axvline(center_freq, color='r', linestyle='--', label=f'Fréquence Centrale ({center_freq} Hz)')
+    plt.legend()
+    plt.xlim(20, sample_rate/2)
+    plt.xscale('log')
+
+
+    # Spectre du signal original et filtré
+    # Utilisation de la méthode de Welch pour une estimation plus lisse du PSD
+    f_orig, Pxx_orig = welch(test_audio, fs=sample_rate, nperseg=1024)
+    f_filt, Pxx_filt = welch(filtered_audio, fs=sample_rate, nperseg=1024)
+
+    plt.subplot(3, 1, 2)
+    plt.semilogx(f_orig, 10 * np.log10(Pxx_orig), label='Original')
+    plt.semilogx(f_filt, 10 * np.log10(Pxx_filt), label='Filtré')
+    plt.title('Spectre de Puissance du Signal Audio (Original vs. Filtré)')
+    plt.xlabel('Fréquence (Hz)')
+    plt.ylabel('Densité Spectrale de Puissance (dB/Hz)')
+    plt.grid(True)
+    plt.legend()
+    plt.xlim(20, sample_rate/2)
+
+    # Affichage des coefficients du FIR
+    plt.subplot(3, 1, 3)
+    plt.plot(fir_coefficients)
+    plt.title('Coefficients de la Réponse Impulsionnelle du FIR')
+    plt.xlabel('Échantillon')
+    plt.ylabel('Amplitude')
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare les méthodes de convolution FIR : directe, FFT sur tout le signal et partitionnée.
+
+À lancer depuis la racine du dépôt :
+    python -m filtres.bench_convolution
+"""
+import argparse
+import timeit
+import numpy as np
+from filtres.convolution import METHODS, PartitionedConvolver, fir_filter
+
+def best_of(func, repeat):
+    """Retourne la plus rapide de `repeat` exécutions de `func`, en millisecondes."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la convolution FIR.")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Durée du signal en secondes.")
+    parser.add_argument("--taps", type=int, default=2048, help="Nombre de coefficients du FIR.")
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[128, 256, 512, 1024, 2048])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-direct", action="store_true", help="Ignore la convolution directe (lente).")
+    args = parser.parse_args()
+
+    sample_rate = 44100
+    rng = np.random.default_rng(0)
+    signal = rng.standard_normal((int(args.seconds * sample_rate), args.channels))
+    coefficients = rng.standard_normal(args.taps) * np.blackman(args.taps)
+    reference = fir_filter(signal, coefficients, method='fft')
+    realtime_ms = args.seconds * 1e3
+
+    print(f"{args.taps} coefficients, {args.seconds} s, {args.channels} canaux")
+    print(f"{'méthode':<22}{'temps (ms)':>12}{'x temps réel':>14}{'erreur max':>12}")
+    for method in METHODS:
+        if method == 'partitioned' or (method == 'direct' and args.skip_direct):
+            continue
+        elapsed = best_of(lambda: fir_filter(signal, coefficients, method=method), args.repeat)
+        error = np.max(np.abs(fir_filter(signal, coefficients, method=method) - reference))
+        print(f"{method:<22}{elapsed:>12.1f}{realtime_ms / elapsed:>14.0f}{error:>12.1e}")
+
+    for block_size in args.block_sizes:
+        convolver = PartitionedConvolver(coefficients, block_size, args.channels)
+        elapsed = best_of(lambda: convolver.filter(signal), args.repeat)
+        error = np.max(np.abs(convolver.filter(signal) - reference))
+        label = f"partitioned/{block_size}"
+        print(f"{label:<22}{elapsed:>12.1f}{realtime_ms / elapsed:>14.0f}{error:>12.1e}")
+
+    # Coût d'un seul bloc, à comparer à sa durée pour un traitement en temps réel
+    print(f"\n{'bloc':<10}{'latence (ms)':>14}{'coût/bloc (us)':>16}{'budget (us)':>14}")
+    for block_size in args.block_sizes:
+        convolver = PartitionedConvolver(coefficients, block_size, args.channels)
+        block = signal[:block_size]
+        elapsed = min(timeit.repeat(lambda: convolver.process_block(block), number=100, repeat=args.repeat)) * 1e4
+        budget = block_size / sample_rate * 1e6
+        print(f"{block_size:<10}{block_size / sample_rate * 1e3:>14.1f}{elapsed:>16.0f}{budget:>14.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import functools
+import numpy as np
+import scipy.fft
+from scipy.signal import convolve, fftconvolve
+
+# Méthodes de filtrage disponibles dans fir_filter
+METHODS = ('direct', 'fft', 'partitioned')
+
+# --- 1. Spectres des partitions, mis en cache par (coefficients, taille de bloc) ---
+@functools.lru_cache(maxsize=32)
+def _partition_spectra(coefficient_bytes, shape, block_size):
+    coefficients = np.frombuffer(coefficient_bytes, dtype=np.float64).reshape(shape)
+    num_partitions = -(-shape[0] // block_size)
+    padded = np.zeros((num_partitions * block_size,) + shape[1:])
+    padded[:shape[0]] = coefficients
+    partitions = padded.reshape((num_partitions, block_size) + shape[1:])
+    # Chaque partition est complétée par des zéros jusqu'à 2 * block_size (overlap-save)
+    spectra = scipy.fft.rfft(partitions, n=2 * block_size, axis=1)
+    spectra.flags.writeable = False
+    return spectra
+
+def partition_spectra(coefficients, block_size):
+    """
+    Calcule (une seule fois) les FFT des partitions uniformes d'un FIR.
+
+    Args:
+        coefficients (np.array): Coefficients du FIR, (taps,) ou (taps, canaux).
+        block_size (int): Taille des partitions en échantillons.
+
+    Returns:
+        np.array: Spectres de forme (partitions, block_size + 1[, canaux]), en lecture seule.
+    """
+    coefficients = np.ascontiguousarray(coefficients, dtype=np.float64)
+    return _partition_spectra(coefficients.tobytes(), coefficients.shape, block_size)
+
+def _mode_span(num_samples, num_taps, mode):
+    """Début et longueur de la sortie dans la convolution complète, comme scipy.signal.convolve."""
+    if mode == 'full':
+        return 0, num_samples + num_taps - 1
+    if mode == 'same':
+        return (num_taps - 1) // 2, num_samples
+    raise ValueError(f"Mode '{mode}' inconnu, attendu 'full' ou 'same'.")
+
+# --- 2. Convolution partitionnée en flux continu ---
+class PartitionedConvolver:
+    """
+    Convolution FIR par overlap-save à partitions uniformes, en flux continu.
+
+    Le filtre est découpé en partitions de `block_size` échantillons dont les
+    FFT sont calculées une seule fois. Chaque bloc d'entrée n'est transformé
+    qu'une fois, puis multiplié par toutes les partitions grâce à une ligne à
+    retard fréquentielle. La mémoire utilisée ne dépend pas de la longueur du
+    signal, et la latence vaut `block_size` échantillons quelle que soit la
+    taille des blocs passés à `process`.
+    """
+    def __init__(self, coefficients, block_size=512, channels=1):
+        """
+        Args:
+            coefficients (np.array): Coefficients du FIR, (taps,) pour un filtre
+                                     commun à tous les canaux ou (taps, canaux).
+            block_size (int): Taille de bloc (et de partition) en échantillons.
+            channels (int): Nombre de canaux du signal.
+        """
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+        if coefficients.ndim == 1:
+            coefficients = coefficients[:, np.newaxis]
+        if coefficients.shape[1] not in (1, channels):
+            raise ValueError(f"{coefficients.shape[1]} jeux de coefficients pour {channels} canaux.")
+        self.block_size = block_size
+        self.channels = channels
+        self.num_taps = len(coefficients)
+        self.spectra = partition_spectra(coefficients, block_size)
+        self.num_partitions = len(self.spectra)
+        self.reset()
+
+    @property
+    def latency(self):
+        """Retard en échantillons de la sortie de `process` par rapport à la convolution."""
+        return self.block_size
+
+    def reset(self):
+        """Vide la ligne à retard et les tampons d'entrée et de sortie."""
+        size = self.block_size
+        self._delay_line = np.zeros((self.num_partitions, size + 1, self.channels), dtype=np.complex128)
+        self._position = 0
+        self._window = np.zeros((2 * size, self.channels))
+        self._input = np.zeros((size, self.channels))
+        self._output = np.zeros((size, self.channels))
+        self._fill = 0
+
+    def process_block(self, block):
+        """
+        Filtre exactement un bloc de `block_size` échantillons, sans latence.
+
+        Args:
+            block (np.array): Bloc d'entrée (block_size, canaux).
+
+        Returns:
+            np.array: Bloc de sortie (block_size, canaux), float64.
+        """
+        size = self.block_size
+        # Fenêtre glissante de 2 blocs : l'ancien bloc puis le nouveau
+        self._window[:size] = self._window[size:]
+        self._window[size:] = block
+        self._position = (self._position + 1) % self.num_partitions
+        self._delay_line[self._position] = scipy.fft.rfft(self._window, axis=0)
+
+        # Somme de la partition p multipliée par le spectre d'entrée retardé de p blocs.
+        # Les deux tranches parcourent la ligne circulaire à rebours, sans copie.
+        position = self._position
+        spectrum = np.einsum('pfc,pfc->fc', self.spectra[:position + 1], self._delay_line[position::-1])
+        if position + 1 < self.num_partitions:
+            spectrum += np.einsum('pfc,pfc->fc', self.spectra[position + 1:], self._delay_line[:position:-1])
+        # Overlap-save : seule la seconde moitié est exempte de repliement circulaire
+        return scipy.fft.irfft(spectrum, n=2 * size, axis=0)[size:]
+
+    def process(self, block):
+        """
+        Filtre un bloc de taille quelconque.
+
+        Les échantillons sont regroupés en blocs de `block_size`. La sortie a la
+        même taille que l'entrée et correspond à la convolution causale retardée
+        de `latency` échantillons.
+
+        Args:
+            block (np.array): Bloc d'entrée (échantillons,) ou (échantillons, canaux).
+
+        Returns:
+            np.array: Bloc de sortie de même forme que l'entrée, float64.
+        """
+        block = np.asarray(block)
+        samples = block.reshape(len(block), self.channels)
+        output = np.empty(samples.shape)
+        size = self.block_size
+        read = 0
+        while read < len(samples):
+            count = min(size - self._fill, len(samples) - read)
+            span = slice(self._fill, self._fill + count)
+            # Le tampon de sortie contient le résultat du bloc d'entrée précédent
+            output[read:read + count] = self._output[span]
+            self._input[span] = samples[read:read + count]
+            self._fill += count
+            read += count
+            if self._fill == size:
+                self._output[:] = self.process_block(self._input)
+                self._fill = 0
+        return output.reshape(block.shape)
+
+    def filter(self, signal, mode='same'):
+        """
+        Filtre un signal complet par blocs, avec le même résultat que scipy.signal.convolve.
+
+        Args:
+            signal (np.array): Signal (échantillons,) ou (échantillons, canaux).
+            mode (str): 'full' ou 'same'.
+
+        Returns:
+            np.array: Signal filtré, float64.
+        """
+        signal = np.asarray(signal)
+        output = np.empty((_mode_span(len(signal), self.num_taps, mode)[1],) + signal.shape[1:])
+        written = 0
+        for block in self.stream(_blocks(signal, self.block_size), len(signal), mode):
+            output[written:written + len(block)] = block
+            written += len(block)
+        return output
+
+    def stream(self, blocks, num_samples, mode='same'):
+        """
+        Filtre un flux de blocs et produit la sortie alignée, sans latence.
+
+        Les blocs de sortie ne suivent pas forcément le découpage des blocs
+        d'entrée ; la fin du filtre est produite en complétant le flux de zéros.
+
+        Args:
+            blocks (Iterable[np.array]): Blocs d'entrée, (échantillons,) ou
+                                         (échantillons, canaux).
+            num_samples (int): Nombre total d'échantillons du flux.
+            mode (str): 'full' ou 'same'.
+
+        Yields:
+            np.array: Blocs filtrés, float64, dont la concaténation vaut
+                      scipy.signal.convolve(signal, coefficients, mode).
+        """
+        start, length = _mode_span(num_samples, self.num_taps, mode)
+        self.reset()
+        skip = self.latency + start
+        remaining = length
+
+        def emit(filtered):
+            nonlocal skip, remaining
+            drop = min(skip, len(filtered))
+            skip -= drop
+            keep = filtered[drop:drop + remaining]
+            remaining -= len(keep)
+            return keep
+
+        shape = (self.channels,)
+        for block in blocks:
+            shape = np.shape(block)[1:]
+            keep = emit(self.process(block))
+            if len(keep):
+                yield keep
+        # Vidage : queue du filtre et latence de regroupement
+        silence = np.zeros((self.block_size,) + shape)
+        while remaining > 0:
+            keep = emit(self.process(silence))
+            if len(keep):
+                yield keep
+
+def _blocks(signal, block_size):
+    for start in range(0, len(signal), block_size):
+        yield signal[start:start + block_size]
+
+# --- 3. Interface commune aux trois méthodes ---
+def fir_filter(signal, coefficients, mode='same', method='partitioned', block_size=1024):
+    """
+    Applique un FIR à un signal mono ou multicanal (échantillons, canaux).
+
+    Args:
+        signal (np.array): Signal (échantillons,) ou (échantillons, canaux).
+        coefficients (np.array): Coefficients du FIR, (taps,) ou (taps, canaux).
+        mode (str): 'full' ou 'same', comme scipy.signal.convolve.
+        method (str): 'direct' (convolution temporelle), 'fft' (une FFT sur tout
+                      le signal) ou 'partitioned' (overlap-save par blocs).
+        block_size (int): Taille de bloc de la méthode 'partitioned'.
+
+    Returns:
+        np.array: Signal filtré.
+    """
+    signal = np.asarray(signal)
+    coefficients = np.asarray(coefficients)
+    if method == 'partitioned':
+        channels = signal.shape[1] if signal.ndim > 1 else 1
+        return PartitionedConvolver(coefficients, block_size, channels).filter(signal, mode)
+    if method not in METHODS:
+        raise ValueError(f"Méthode '{method}' inconnue, attendu l'une de {METHODS}.")
+    if signal.ndim > 1 and coefficients.ndim == 1:
+        coefficients = coefficients[:, np.newaxis]
+    if method == 'fft':
+        return fftconvolve(signal, coefficients, mode=mode, axes=0)
+    if signal.ndim == 1:
+        return convolve(signal, coefficients, mode=mode, method='direct')
+    # La convolution directe 2D mélangerait les canaux : un canal à la fois
+    return np.stack([
+        convolve(signal[:, channel], coefficients[:, channel % coefficients.shape[1]], mode=mode, method='direct')
+        for channel in range(signal.shape[1])
+    ], axis=1)
+
+def filter_file(input_path, output_path, coefficients, mode='same', block_size=4096, subtype=None):
+    """
+    Filtre un fichier audio par blocs, avec une mémoire constante.
+
+    Args:
+        input_path (str): Fichier audio d'entrée.
+        output_path (str): Fichier audio de sortie.
+        coefficients (np.array): Coefficients du FIR, (taps,) ou (taps, canaux).
+        mode (str): 'full' ou 'same'.
+        block_size (int): Taille des blocs de lecture et de convolution.
+        subtype (str): Format des échantillons en sortie ; celui de l'entrée par défaut.
+    """
+    import soundfile as sf
+    with sf.SoundFile(input_path) as infile:
+        convolver = PartitionedConvolver(coefficients, block_size, infile.channels)
+        with sf.SoundFile(output_path, 'w', samplerate=infile.samplerate, channels=infile.channels,
+                          subtype=subtype or infile.subtype) as outfile:
+            blocks = infile.blocks(blocksize=block_size, always_2d=True)
+            for block in convolver.stream(blocks, infile.frames, mode):
+                outfile.write(block)
@@ -0,0 +1,244 @@
+import functools
+import numpy as np
+from scipy.signal import sosfilt, sosfreqz
+from filtres.bell import linear_phase_fir
+from filtres.convolution import PartitionedConvolver
+
+# Réglages par défaut, nommés comme les contrôles du layout du plugin
+# (voir templateGenerator). Gains en dB, fréquences en Hz.
+EQ_DEFAULTS = {
+    'GainKnob': 0.0,
+    'LcFreq': 20.0, 'LcQ': 0.707,
+    'Bell1Freq': 250.0, 'Bell1Gain': 0.0, 'Bell1Q': 1.0,
+    'Bell2Freq': 2500.0, 'Bell2Gain': 0.0, 'Bell2Q': 1.0,
+    'HSFreq': 8000.0, 'HSGain': 0.0, 'HSq': 0.707,
+    'outputGain': 0.0,
+}
+
+# Bandes dans l'ordre du traitement : (type de biquad, fréquence, gain, Q)
+BANDS = (
+    ('highpass', 'LcFreq', None, 'LcQ'),
+    ('peaking', 'Bell1Freq', 'Bell1Gain', 'Bell1Q'),
+    ('peaking', 'Bell2Freq', 'Bell2Gain', 'Bell2Q'),
+    ('highshelf', 'HSFreq', 'HSGain', 'HSq'),
+)
+
+MODES = ('iir', 'fir')
+
+# --- 1. Biquads RBJ (Audio EQ Cookbook), vectorisés sur les paramètres ---
+def rbj_biquad(kind, sample_rate, frequency, Q_factor, gain_dB=0.0):
+    """
+    Calcule les coefficients d'un ou plusieurs biquads RBJ.
+
+    Args:
+        kind (str): 'highpass', 'peaking' ou 'highshelf'.
+        sample_rate (int): Fréquence d'échantillonnage en Hz.
+        frequency (float | np.array): Fréquence(s) de coupure ou centrale(s) en Hz.
+        Q_factor (float | np.array): Facteur(s) de qualité.
+        gain_dB (float | np.array): Gain(s) en dB (ignoré pour 'highpass').
+
+    Returns:
+        np.array: Sections au format sos de scipy, de forme (..., 6), normalisées par a0.
+    """
+    # Fréquences bornées sous Nyquist pour garder des filtres stables
+    frequency = np.clip(np.asarray(frequency, dtype=np.float64), 1.0, 0.49 * sample_rate)
+    Q_factor = np.maximum(np.asarray(Q_factor, dtype=np.float64), 1e-3)
+    A = 10**(np.asarray(gain_dB, dtype=np.float64) / 40.0)
+    w0 = 2 * np.pi * frequency / sample_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * Q_factor)
+
+    if kind == 'highpass':
+        b = ((1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2)
+        a = (1 + alpha, -2 * cos_w0, 1 - alpha)
+    elif kind == 'peaking':
+        b = (1 + alpha * A, -2 * cos_w0, 1 - alpha * A)
+        a = (1 + alpha / A, -2 * cos_w0, 1 - alpha / A)
+    elif kind == 'highshelf':
+        sqrt_A_alpha = 2 * np.sqrt(A) * alpha
+        b = (A * ((A + 1) + (A - 1) * cos_w0 + sqrt_A_alpha),
+             -2 * A * ((A - 1) + (A + 1) * cos_w0),
+             A * ((A + 1) + (A - 1) * cos_w0 - sqrt_A_alpha))
+        a = ((A + 1) - (A - 1) * cos_w0 + sqrt_A_alpha,
+             2 * ((A - 1) - (A + 1) * cos_w0),
+             (A + 1) - (A - 1) * cos_w0 - sqrt_A_alpha)
+    else:
+        raise ValueError(f"Type de biquad '{kind}' inconnu.")
+
+    coefficients = np.stack(np.broadcast_arrays(*b, *a), axis=-1)
+    return coefficients / coefficients[..., 3:4]
+
+def eq_sos(sample_rate, **params):
+    """
+    Calcule la cascade de biquads de l'EQ complet.
+
+    Les réglages peuvent être des tableaux (de formes compatibles) pour
+    concevoir d'un coup plusieurs états de l'EQ, par exemple pour une automation.
+
+    Args:
+        sample_rate (int): Fréquence d'échantillonnage en Hz.
+        **params: Réglages nommés comme EQ_DEFAULTS ; les absents prennent leur
+                  valeur par défaut.
+
+    Returns:
+        np.array: Sections de forme (..., len(BANDS), 6). Les gains d'entrée et
+                  de sortie sont appliqués au numérateur de la première section.
+    """
+    unknown = set(params) - set(EQ_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Réglages d'EQ inconnus : {sorted(unknown)}")
+    settings = {**EQ_DEFAULTS, **params}
+    sections = [
+        rbj_biquad(kind, sample_rate, settings[freq], settings[q], settings[gain] if gain else 0.0)
+        for kind, freq, gain, q in BANDS
+    ]
+    sos = np.stack(np.broadcast_arrays(*sections), axis=-2)
+    gain = 10**((np.asarray(settings['GainKnob']) + np.asarray(settings['outputGain'])) / 20.0)
+    sos[..., 0, :3] *= np.asarray(gain)[..., np.newaxis]
+    return sos
+
+@functools.lru_cache(maxsize=256)
+def _design(mode, sample_rate, fir_order, settings):
+    sos = eq_sos(sample_rate, **dict(settings))
+    if mode == 'iir':
+        sos.flags.writeable = False
+        return sos
+    # Le FIR reprend la magnitude de la cascade de biquads, avec une phase linéaire
+    frequencies_for_fft = np.abs(np.fft.fftfreq(fir_order, d=1/sample_rate))
+    _, response = sosfreqz(sos, worN=frequencies_for_fft, fs=sample_rate)
+    return linear_phase_fir(np.abs(response))
+
+def design_eq(sample_rate, mode='iir', fir_order=2048, **params):
+    """
+    Conçoit l'EQ, avec mémorisation (LRU) par (mode, sample_rate, fir_order, réglages).
+
+    Args:
+        sample_rate (int): Fréquence d'échantillonnage en Hz.
+        mode (str): 'iir' pour la cascade de biquads, 'fir' pour un FIR à phase linéaire
+                    de même magnitude.
+        fir_order (int): Nombre de coefficients du FIR.
+        **params: Réglages scalaires nommés comme EQ_DEFAULTS.
+
+    Returns:
+        np.array: Sections sos (len(BANDS), 6) ou coefficients FIR (fir_order,), en lecture seule.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode '{mode}' inconnu, attendu l'un de {MODES}.")
+    settings = tuple(sorted((name, float(value)) for name, value in params.items()))
+    return _design(mode, float(sample_rate), int(fir_order) if mode == 'fir' else 0, settings)
+
+# --- 2. EQ paramétrique en flux continu ---
+class ParametricEQ:
+    """
+    EQ paramétrique reprenant les bandes du plugin : coupe-bas (LC), deux cloches
+    (Bell1, Bell2), plateau aigu (HS), gains d'entrée et de sortie.
+
+    En mode 'iir', les bandes sont une cascade de biquads RBJ filtrée par sosfilt
+    sur tous les canaux à la fois, sans latence. En mode 'fir', un FIR à phase
+    linéaire de même magnitude est appliqué par convolution partitionnée, avec
+    une latence de `fir_order // 2 + block_size` échantillons en flux continu.
+    L'état des filtres est conservé entre les blocs.
+    """
+    def __init__(self, sample_rate, channels=2, mode='iir', fir_order=2048, block_size=512, **params):
+        """
+        Args:
+            sample_rate (int): Fréquence d'échantillonnage en Hz.
+            channels (int): Nombre de canaux.
+            mode (str): 'iir' ou 'fir'.
+            fir_order (int): Nombre de coefficients du FIR (mode 'fir').
+            block_size (int): Taille de partition de la convolution (mode 'fir').
+            **params: Réglages nommés comme EQ_DEFAULTS.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode '{mode}' inconnu, attendu l'un de {MODES}.")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.mode = mode
+        self.fir_order = fir_order
+        self.block_size = block_size
+        self.params = dict(EQ_DEFAULTS)
+        self.coefficients = None
+        self._zi = None
+        self.set_parameters(params)
+
+    def set_parameters(self, params):
+        """
+        Modifie des réglages ; le filtre n'est reconçu que si l'un d'eux change.
+
+        Args:
+            params (dict): Réglages nommés comme EQ_DEFAULTS.
+
+        Returns:
+            dict: Les réglages effectivement modifiés.
+        """
+        unknown = set(params) - set(EQ_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Réglages d'EQ inconnus : {sorted(unknown)}")
+        changed = {name: value for name, value in params.items() if self.params[name] != value}
+        self.params.update(changed)
+        if changed or self.coefficients is None:
+            self.coefficients = design_eq(self.sample_rate, self.mode, self.fir_order, **self.params)
+            if self.mode == 'fir':
+                # Un nouveau FIR repart d'une ligne à retard vide
+                self._convolver = PartitionedConvolver(self.coefficients, self.block_size, self.channels)
+            else:
+                # sosfilt a besoin de sections modifiables, le cache est en lecture seule
+                self._sos = np.array(self.coefficients)
+                if self._zi is None:
+                    self.reset()
+        return changed
+
+    @property
+    def latency(self):
+        """Retard en échantillons introduit par `process`."""
+        if self.mode == 'iir':
+            return 0
+        return self.fir_order // 2 + self._convolver.latency
+
+    def reset(self):
+        """Vide l'état des filtres."""
+        self._zi = np.zeros((len(BANDS), 2, self.channels))
+        if self.mode == 'fir':
+            self._convolver.reset()
+
+    def process(self, block):
+        """
+        Filtre un bloc en conservant l'état pour le bloc suivant.
+
+        Args:
+            block (np.array): Bloc (échantillons,) ou (échantillons, canaux).
+
+        Returns:
+            np.array: Bloc filtré de même forme, float64.
+        """
+        block = np.asarray(block)
+        if self.mode == 'fir':
+            return self._convolver.process(block)
+        samples = block.reshape(len(block), self.channels)
+        filtered, self._zi = sosfilt(self._sos, samples, axis=0, zi=self._zi)
+        return filtered.reshape(block.shape)
+
+    def filter(self, signal):
+        """
+        Filtre un signal complet, aligné sur l'entrée (la latence du FIR est compensée).
+
+        Args:
+            signal (np.array): Signal (échantillons,) ou (échantillons, canaux).
+
+        Returns:
+            np.array: Signal filtré, float64.
+        """
+        self.reset()
+        if self.mode == 'fir':
+            return self._convolver.filter(signal, mode='same')
+        return self.process(signal)
+
+    def frequency_response(self, frequencies):
+        """
+        Retourne la réponse complexe de l'EQ aux fréquences données (en Hz).
+        En mode 'fir', la magnitude est celle du FIR et sa phase inclut le délai du FIR.
+        """
+        if self.mode == 'iir':
+            return sosfreqz(self.coefficients, worN=frequencies, fs=self.sample_rate)[1]
+        w = 2 * np.pi * np.asarray(frequencies) / self.sample_rate
+        return np.exp(-1j * np.multiply.outer(w, np.arange(self.fir_order))) @ self.coefficients
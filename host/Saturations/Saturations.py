@@ -1,6 +1,107 @@
+import functools
 import numpy as np
 
-def add_tanh_harmonics(signal, amount=1.0, bias=0.0):
+class CurveTable:
+    """
+    A piecewise-linear lookup table for a memoryless saturation curve.
+
+    The grid is refined until the interpolation error, measured at the cell
+    midpoints, is below `max_error`. Inputs outside `x_range` are clamped to
+    its endpoints.
+    """
+    MAX_POINTS = 2 ** 16 + 1
+
+    def __init__(self, func, x_range=(-1.0, 1.0), max_error=1e-4):
+        """
+        Initializes the CurveTable.
+
+        Args:
+            func (callable): The exact curve, evaluated on float64 arrays.
+            x_range (tuple): The (min, max) input range covered by the table.
+            max_error (float): The maximum absolute interpolation error.
+        """
+        self.x_min, self.x_max = float(x_range[0]), float(x_range[1])
+        num_points = 257
+        while True:
+            grid = np.linspace(self.x_min, self.x_max, num_points)
+            values = func(grid)
+            midpoints = 0.5 * (grid[1:] + grid[:-1])
+            error = np.max(np.abs(func(midpoints) - 0.5 * (values[1:] + values[:-1])))
+            if error <= max_error or num_points >= self.MAX_POINTS:
+                break
+            num_points = 2 * num_points - 1
+        self.error = float(error)
+        self.num_points = num_points
+        self.values = values
+        self.slopes = np.append(np.diff(values), 0.0)
+        self._scale = (num_points - 1) / (self.x_max - self.x_min)
+
+    def __call__(self, x, out=None):
+        """
+        Evaluates the table at `x`.
+
+        Args:
+            x (np.ndarray): The input values.
+            out (np.ndarray): Optional output array, may be `x` itself.
+
+        Returns:
+            np.ndarray: The interpolated curve values.
+        """
+        dtype = np.result_type(x.dtype, np.float32)
+        position = np.subtract(x, self.x_min, dtype=dtype)
+        position *= self._scale
+        np.clip(position, 0, self.num_points - 1, out=position)
+        index = position.astype(np.intp)
+        position -= index
+        if out is None:
+            out = np.empty(x.shape, dtype=dtype)
+        np.take(self.slopes.astype(dtype, copy=False), index, out=out)
+        out *= position
+        out += self.values.astype(dtype, copy=False).take(index)
+        return out
+
+def _asym_curve(x, amount):
+    return np.clip(x + amount * x * x, -1, 1)
+
+def _tanh_curve(x, amount, bias):
+    return np.tanh(amount * (x + bias))
+
+_CURVES = {
+    'asym': lambda amount, bias: lambda x: _asym_curve(x, amount),
+    'tanh': lambda amount, bias: lambda x: _tanh_curve(x, amount, bias),
+    'cubic': lambda amount, bias: lambda x: x - amount * x ** 3 / 3,
+    'fullrect': lambda amount, bias: lambda x: amount * np.abs(x) + (1 - amount) * x,
+    # The front end of `saturation_chain`: asym clip (amount `bias`) into tanh.
+    'asym_tanh': lambda amount, bias: lambda x: np.tanh(amount * _asym_curve(x, bias[0]) + amount * bias[1]),
+}
+
+@functools.lru_cache(maxsize=256)
+def curve_table(curve, amount, bias=0.0, max_error=1e-4, x_range=(-1.0, 1.0)):
+    """
+    Returns a cached `CurveTable` for one of the curves in this module.
+
+    Tables are built once per (curve, amount, bias, max_error, x_range) and
+    shared afterwards, so rendering many variations only pays for the lookups.
+
+    Args:
+        curve (str): One of 'asym', 'tanh', 'cubic', 'fullrect' or 'asym_tanh'.
+        amount (float): The curve amount (drive for 'tanh' and 'asym_tanh').
+        bias (float): The tanh bias; a (asym amount, tanh bias) pair for 'asym_tanh'.
+        max_error (float): The maximum absolute interpolation error.
+        x_range (tuple): The (min, max) input range covered by the table.
+
+    Returns:
+        CurveTable: The lookup table.
+    """
+    if curve not in _CURVES:
+        raise ValueError(f"Unknown curve '{curve}', expected one of {sorted(_CURVES)}.")
+    return CurveTable(_CURVES[curve](amount, bias), x_range=x_range, max_error=max_error)
+
+def tanh_table(amount, bias=0.0, max_error=1e-4):
+    """Returns the cached lookup table for tanh(amount * (x + bias)) on [-1, 1]."""
+    return curve_table('tanh', float(amount), float(bias), max_error)
+
+def add_tanh_harmonics(signal, amount=1.0, bias=0.0, remove_dc=True, fast=False, max_error=1e-4):
     """
     Applies tanh saturation with an adjustable bias to control even harmonics.
 
@@ -13,30 +114,136 @@ def add_tanh_harmonics(signal, amount=1.0, bias=0.0):
                       Positive values saturate the top half of the wave more,
                       negative values saturate the bottom half more.
                       Recommended range: -1.0 to 1.0.
+        remove_dc (bool): Whether to subtract the mean of the saturated signal.
+                          Streaming callers disable this and run a stateful
+                          DC-blocker instead, since a per-block mean would
+                          step at every block boundary.
+        fast (bool): Use a cached lookup table instead of `np.tanh`. Inputs
+                     outside [-1, 1] are clamped.
+        max_error (float): The maximum absolute error of the lookup table.
 
     Returns:
         np.ndarray: The saturated audio signal.
     """
-    # Apply the bias to introduce asymmetry
-    biased_signal = signal + bias
-    
-    # Apply the tanh saturation
-    saturated_signal = np.tanh(amount * biased_signal)
+    if fast:
+        saturated_signal = tanh_table(amount, bias, max_error)(signal)
+    else:
+        # Apply the bias to introduce asymmetry
+        biased_signal = signal + bias
+
+        # Apply the tanh saturation
+        saturated_signal = np.tanh(amount * biased_signal)
     
     # IMPORTANT: Remove the new DC offset created by the asymmetric clipping.
     # If we don't do this, the waveform will not be centered on 0, which can
     # cause issues with other processors and create clicks.
+    if not remove_dc:
+        return saturated_signal
     output_signal = saturated_signal - np.mean(saturated_signal)
     
     return output_signal
-def add_cubic_harmonics(audio, amount=1.0):
+def add_cubic_harmonics(audio, amount=1.0, fast=False, max_error=1e-4):
     """Add cubic nonlinearity for odd harmonics."""
+    if fast:
+        return curve_table('cubic', float(amount), 0.0, max_error)(audio)
     return audio - amount * (audio ** 3) / 3
 
-def add_fullrect_harmonics(audio, amount=1.0):
+def add_fullrect_harmonics(audio, amount=1.0, fast=False, max_error=1e-4):
     """Full-wave rectification for even harmonics."""
+    if fast:
+        return curve_table('fullrect', float(amount), 0.0, max_error)(audio)
     return amount * np.abs(audio) + (1 - amount) * audio
 
-def add_asym_clip(audio, amount=1.0):
+def add_asym_clip(audio, amount=1.0, fast=False, max_error=1e-4):
     """Asymmetric clipping for both even and odd harmonics."""
+    if fast:
+        return curve_table('asym', float(amount), 0.0, max_error)(audio)
     return np.clip(audio + amount * (audio ** 2), -1, 1)
+
+def saturation_chain(audio, asym=0.07, tanh=1.0, tanh_bias=0.0, cubic=1.0, fullrect=0.0,
+                     remove_dc=True, dc_filter=None, out=None, scratch=None, axis=0,
+                     fast=False, max_error=1e-4):
+    """
+    Applies the asym clip -> tanh -> cubic -> full-rect chain in one fused pass.
+
+    Produces the same result as calling `add_asym_clip`, `add_tanh_harmonics`,
+    `add_cubic_harmonics` and `add_fullrect_harmonics` in that order, but works
+    on the whole (samples, channels) array at once and writes every
+    intermediate result into `out` and a single `scratch` buffer instead of
+    allocating new arrays at each step.
+
+    The amounts may also be arrays that broadcast against `audio`, e.g. of
+    shape (points, 1, 1) for a (samples, channels) signal, to evaluate many
+    settings at once; `out` then has the broadcast shape.
+
+    Args:
+        audio (np.ndarray): The input audio signal, e.g. (samples, channels).
+        asym (float): Amount for the asymmetric clipping stage.
+        tanh (float): Drive amount for the tanh stage.
+        tanh_bias (float): Bias applied before the tanh stage.
+        cubic (float): Amount for the cubic stage.
+        fullrect (float): Amount for the full-wave rectification stage.
+        remove_dc (bool): Whether to subtract the mean of the tanh output along
+                          `axis`, as `add_tanh_harmonics` does.
+        dc_filter (callable): Optional filter applied to the tanh output instead
+                              of the mean removal, e.g. `DCBlocker.process` for
+                              streaming use.
+        out (np.ndarray): Optional output array. May be `audio` itself to
+                          process in place.
+        scratch (np.ndarray): Optional work buffer with the shape and dtype of
+                              `out`. Reusing it across calls avoids allocations.
+        axis (int): The time axis, used for the mean removal.
+        fast (bool): Replace the asym clip and tanh stages by a single cached
+                     lookup table covering inputs in [-2, 2]; outside of it
+                     the input is clamped.
+        max_error (float): The maximum absolute error of the lookup table.
+
+    Returns:
+        np.ndarray: The saturated signal (`out` when given).
+    """
+    if out is None:
+        shape = np.broadcast_shapes(audio.shape, *(np.shape(p) for p in (asym, tanh, tanh_bias, cubic, fullrect)))
+        out = np.empty(shape, dtype=np.result_type(audio.dtype, np.float32))
+    if out is not audio:
+        np.copyto(out, audio)
+    if scratch is None or scratch.shape != out.shape or scratch.dtype != out.dtype:
+        scratch = np.empty_like(out)
+
+    if fast:
+        if any(np.ndim(p) for p in (asym, tanh, tanh_bias)):
+            raise ValueError("fast=True requires scalar asym, tanh and tanh_bias.")
+        table = curve_table('asym_tanh', float(tanh), (float(asym), float(tanh_bias)), max_error, (-2.0, 2.0))
+        table(out, out=out)
+    else:
+        # Asymmetric clip: clip(x + asym * x^2)
+        np.multiply(out, out, out=scratch)
+        scratch *= asym
+        out += scratch
+        np.clip(out, -1, 1, out=out)
+
+        # Biased tanh
+        out += tanh_bias
+        out *= tanh
+        np.tanh(out, out=out)
+
+    # DC removal
+    if dc_filter is not None:
+        out[...] = dc_filter(out)
+    elif remove_dc:
+        out -= out.mean(axis=axis, keepdims=True, dtype=np.float64).astype(out.dtype)
+
+    # Cubic: x - cubic * x^3 / 3
+    if np.any(cubic):
+        np.multiply(out, out, out=scratch)
+        scratch *= out
+        scratch *= np.divide(cubic, 3)
+        out -= scratch
+
+    # Full-wave rectification: fullrect * |x| + (1 - fullrect) * x
+    if np.any(fullrect):
+        np.abs(out, out=scratch)
+        scratch *= fullrect
+        out *= np.subtract(1, fullrect)
+        out += scratch
+
+    return out
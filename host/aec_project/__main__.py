@@ -0,0 +1,11 @@
+# aec_project/__main__.py
+import os
+import sys
+
+# The EQ stages import the filtres package, which lives at the repository
+# root next to host/; make it importable for this command only.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from .cli import main
+
+sys.exit(main())
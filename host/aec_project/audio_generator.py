@@ -1,8 +1,42 @@
 # aec_project/audio_generator.py
 import numpy as np
+from typing import Sequence
+
+def sweep_rate(duration: float, f_start: float, f_end: float, synchronized: bool = True) -> float:
+    """
+    Returns the rate L of an exponential sweep, whose frequency is f_start * exp(t / L).
+
+    For a synchronized sweep, L is rounded so that f_start * L is an integer.
+    The k-th harmonic of such a sweep is then an exact copy of the sweep
+    advanced by L * ln(k), which lets the harmonic responses be separated
+    after deconvolution. The sweep lasts L * ln(f_end / f_start), which can
+    differ slightly from `duration`.
+
+    Args:
+        duration (float): The requested sweep duration in seconds.
+        f_start (float): The start frequency in Hz.
+        f_end (float): The end frequency in Hz.
+        synchronized (bool): Whether to round L as described above.
+
+    Returns:
+        float: The sweep rate L in seconds.
+    """
+    rate = duration / np.log(f_end / f_start)
+    if synchronized:
+        rate = max(round(f_start * rate), 1) / f_start
+    return rate
 
 class SignalGenerator:
-    """Generates various types of audio signals."""
+    """
+    Generates various types of audio signals.
+
+    The time base is computed once per generator and shared, read-only, by
+    all signals. Every signal is returned as a new writable array, so it can
+    be processed in place.
+    """
+    # Upper bound for the float64 phase temporaries of one vectorized call
+    MAX_TEMP_BYTES = 64 * 2 ** 20
+
     def __init__(self, duration: float, sample_rate: int):
         """
         Initializes the SignalGenerator.
@@ -14,20 +48,166 @@ class SignalGenerator:
         self.duration = duration
         self.sample_rate = sample_rate
         self.num_samples = int(self.sample_rate * self.duration)
+        self._time_base = None
 
-    def generate_sine(self, frequency: float, amplitude: float = 0.5) -> np.ndarray:
+    @property
+    def time_base(self) -> np.ndarray:
+        """The cached, read-only sample times in seconds."""
+        if self._time_base is None:
+            self._time_base = np.linspace(0, self.duration, self.num_samples, endpoint=False)
+            self._time_base.flags.writeable = False
+        return self._time_base
+
+    @staticmethod
+    def _to_channels(mono: np.ndarray, channels: int) -> np.ndarray:
+        """Returns `mono` copied into (samples, channels), or as is for channels=1."""
+        if channels == 1:
+            return mono
+        return np.repeat(mono[:, np.newaxis], channels, axis=1)
+
+    def generate_sine(self, frequency: float, amplitude: float = 0.5, channels: int = 2) -> np.ndarray:
         """
         Generates a stereo sine wave.
 
         Args:
             frequency (float): The frequency of the sine wave in Hz.
             amplitude (float): The peak amplitude of the signal.
+            channels (int): The number of identical channels; 1 returns a 1D array.
 
         Returns:
             np.ndarray: A stereo audio signal as a NumPy array.
         """
-        t = np.linspace(0, self.duration, self.num_samples, endpoint=False)
-        mono_signal = (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
-        # Stack the mono signal to create a stereo signal
-        stereo_signal = np.stack([mono_signal, mono_signal], axis=-1)
-        return stereo_signal
\ No newline at end of file
+        return self._to_channels(self.generate_sines([frequency], amplitude)[0], channels)
+
+    def generate_sines(self, frequencies: Sequence[float], amplitude: float = 0.5,
+                       out: np.ndarray = None) -> np.ndarray:
+        """
+        Generates one mono sine per frequency in a single vectorized call.
+
+        Args:
+            frequencies (Sequence[float]): The frequencies in Hz.
+            amplitude (float): The peak amplitude of every sine.
+            out (np.ndarray): Optional preallocated float32 buffer of shape
+                              (len(frequencies), num_samples).
+
+        Returns:
+            np.ndarray: The sines, shape (len(frequencies), num_samples), float32.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        if out is None:
+            out = np.empty((len(frequencies), self.num_samples), dtype=np.float32)
+        rows = max(1, self.MAX_TEMP_BYTES // (8 * max(self.num_samples, 1)))
+        angular_time = 2 * np.pi * self.time_base
+        for start in range(0, len(frequencies), rows):
+            phase = np.multiply.outer(frequencies[start:start + rows], angular_time)
+            np.sin(phase, out=phase)
+            phase *= amplitude
+            out[start:start + rows] = phase
+        return out
+
+    def generate_multitone(self, frequencies: Sequence[float], amplitudes: Sequence[float] = None,
+                           phases: Sequence[float] = None, channels: int = 2) -> np.ndarray:
+        """
+        Generates the sum of several sines.
+
+        Args:
+            frequencies (Sequence[float]): The tone frequencies in Hz.
+            amplitudes (Sequence[float]): The peak amplitude of each tone.
+                                          Defaults to 0.5 / len(frequencies).
+            phases (Sequence[float]): The start phase of each tone in radians.
+            channels (int): The number of identical channels; 1 returns a 1D array.
+
+        Returns:
+            np.ndarray: The multitone signal, float32.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        if amplitudes is None:
+            amplitudes = np.full(len(frequencies), 0.5 / len(frequencies))
+        amplitudes = np.broadcast_to(np.asarray(amplitudes, dtype=np.float64), frequencies.shape)
+        phases = np.broadcast_to(np.asarray(0.0 if phases is None else phases, dtype=np.float64), frequencies.shape)
+
+        mono = np.zeros(self.num_samples, dtype=np.float64)
+        rows = max(1, self.MAX_TEMP_BYTES // (8 * max(self.num_samples, 1)))
+        angular_time = 2 * np.pi * self.time_base
+        for start in range(0, len(frequencies), rows):
+            tones = slice(start, start + rows)
+            phase = np.multiply.outer(frequencies[tones], angular_time)
+            phase += phases[tones, np.newaxis]
+            np.sin(phase, out=phase)
+            mono += amplitudes[tones] @ phase
+        return self._to_channels(mono.astype(np.float32), channels)
+
+    def generate_log_sweep(self, f_start: float, f_end: float, amplitude: float = 0.5,
+                           channels: int = 2, synchronized: bool = False) -> np.ndarray:
+        """
+        Generates an exponential (logarithmic) sine sweep.
+
+        Args:
+            f_start (float): The start frequency in Hz.
+            f_end (float): The end frequency in Hz.
+            amplitude (float): The peak amplitude.
+            channels (int): The number of identical channels; 1 returns a 1D array.
+            synchronized (bool): Use a synchronized sweep (see `sweep_rate`) for
+                                 harmonic measurements. The sweep then ends at
+                                 L * ln(f_end / f_start) seconds and the rest of
+                                 the signal is silent.
+
+        Returns:
+            np.ndarray: The sweep, float32.
+        """
+        rate = sweep_rate(self.duration, f_start, f_end, synchronized)
+        phase = 2 * np.pi * f_start * rate * np.expm1(self.time_base / rate)
+        np.sin(phase, out=phase)
+        phase *= amplitude
+        if synchronized:
+            phase[self.time_base >= rate * np.log(f_end / f_start)] = 0.0
+        return self._to_channels(phase.astype(np.float32), channels)
+
+    def generate_noise(self, kind: str = 'white', amplitude: float = 0.1, channels: int = 2,
+                       independent: bool = False, seed: int = None) -> np.ndarray:
+        """
+        Generates white or pink (1/f) Gaussian noise.
+
+        Args:
+            kind (str): 'white' or 'pink'.
+            amplitude (float): The RMS level.
+            channels (int): The number of channels; 1 returns a 1D array.
+            independent (bool): Draw separate noise per channel instead of
+                                broadcasting one channel.
+            seed (int): Optional seed for reproducible noise.
+
+        Returns:
+            np.ndarray: The noise, float32.
+        """
+        if kind not in ('white', 'pink'):
+            raise ValueError(f"Unknown noise kind '{kind}', expected 'white' or 'pink'.")
+        rng = np.random.default_rng(seed)
+        columns = channels if independent else 1
+        noise = rng.standard_normal((self.num_samples, columns), dtype=np.float32)
+        if kind == 'pink':
+            spectrum = np.fft.rfft(noise, axis=0)
+            bins = np.arange(spectrum.shape[0], dtype=np.float64)
+            bins[0] = 1.0
+            spectrum /= np.sqrt(bins)[:, np.newaxis]
+            spectrum[0] = 0.0
+            noise = np.fft.irfft(spectrum, n=self.num_samples, axis=0).astype(np.float32)
+        noise *= amplitude / np.sqrt(np.mean(noise ** 2, axis=0))
+        if independent:
+            return noise if channels > 1 else noise[:, 0]
+        return self._to_channels(noise[:, 0], channels)
+
+    def generate_impulse(self, position: int = 0, amplitude: float = 1.0, channels: int = 2) -> np.ndarray:
+        """
+        Generates a single unit impulse (Dirac).
+
+        Args:
+            position (int): The sample index of the impulse.
+            amplitude (float): The impulse height.
+            channels (int): The number of identical channels; 1 returns a 1D array.
+
+        Returns:
+            np.ndarray: The impulse signal, float32.
+        """
+        mono = np.zeros(self.num_samples, dtype=np.float32)
+        mono[position] = amplitude
+        return self._to_channels(mono, channels)
@@ -0,0 +1,231 @@
+# aec_project/audio_io.py
+import itertools
+from fractions import Fraction
+from typing import Iterator
+
+import numpy as np
+
+from .resampling import PolyphaseResampler
+
+class _SoundFileSource:
+    """Decodes a file with soundfile (WAV, FLAC, OGG, and MP3 with libsndfile >= 1.1)."""
+    def __init__(self, path: str):
+        import soundfile
+        self._file = soundfile.SoundFile(path)
+        self.samplerate = self._file.samplerate
+        self.channels = self._file.channels
+        self.frames = self._file.frames
+
+    def read_into(self, out: np.ndarray) -> int:
+        return len(self._file.read(out=out))
+
+    def seek(self, frame: int):
+        self._file.seek(frame)
+
+    def close(self):
+        self._file.close()
+
+class _PedalboardSource:
+    """Decodes a file with pedalboard.io, which also reads MP3 on every platform."""
+    def __init__(self, path: str):
+        from pedalboard.io import AudioFile
+        self._file = AudioFile(path)
+        self.samplerate = int(self._file.samplerate)
+        self.channels = self._file.num_channels
+        self.frames = self._file.frames
+
+    def read_into(self, out: np.ndarray) -> int:
+        # pedalboard returns a new (channels, frames) array
+        chunk = self._file.read(len(out))
+        out[:chunk.shape[1]] = chunk.T
+        return chunk.shape[1]
+
+    def seek(self, frame: int):
+        self._file.seek(frame)
+
+    def close(self):
+        self._file.close()
+
+def _open_source(path: str):
+    """Opens `path` with soundfile, falling back to pedalboard for formats it cannot decode."""
+    try:
+        return _SoundFileSource(path)
+    except RuntimeError as soundfile_error:
+        try:
+            return _PedalboardSource(path)
+        except (ImportError, ValueError, RuntimeError):
+            raise soundfile_error from None
+
+class AudioReader:
+    """
+    Reads an audio file as consecutive float32 blocks with constant memory.
+
+    Blocks of shape (block_size, channels) are decoded into one preallocated
+    buffer, so a long song costs one block of memory whatever its length.
+    WAV, FLAC and other libsndfile formats are read with soundfile; MP3 too
+    with libsndfile >= 1.1, and through pedalboard.io otherwise.
+
+    With `sample_rate` set, the audio is resampled on the fly by a polyphase
+    filter with any rational ratio (e.g. 44.1 kHz to 48 kHz). The filter delay
+    is compensated, so the blocks stay aligned with the file.
+    """
+    def __init__(self, path: str, block_size: int = 65536, sample_rate: int = None, taps_per_phase: int = 16):
+        """
+        Initializes the AudioReader.
+
+        Args:
+            path (str): The audio file to read.
+            block_size (int): The number of frames per block, at the output rate.
+            sample_rate (int): The output sample rate. Defaults to the file's rate.
+            taps_per_phase (int): The resampling filter length per polyphase branch.
+        """
+        self.path = path
+        self.block_size = block_size
+        self._source = _open_source(path)
+        self.source_samplerate = self._source.samplerate
+        self.samplerate = sample_rate or self.source_samplerate
+        self.channels = self._source.channels
+        self._buffer = np.empty((block_size, self.channels), dtype=np.float32)
+        self._resampler = None
+        if self.samplerate != self.source_samplerate:
+            ratio = Fraction(self.samplerate, self.source_samplerate)
+            self._resampler = PolyphaseResampler(ratio.numerator, ratio.denominator, taps_per_phase)
+
+    @property
+    def frames(self) -> int:
+        """The number of frames the reader yields, at the output rate."""
+        if self._resampler is None:
+            return self._source.frames
+        return -(-self._source.frames * self._resampler.up // self._resampler.down)
+
+    def close(self):
+        """Closes the file."""
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self.blocks()
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """
+        Reads the file from the start, block by block.
+
+        Yields:
+            np.ndarray: Blocks of shape (block_size, channels); the last one
+                        may be shorter. The buffer is reused for the next block,
+                        so copy a block to keep it.
+        """
+        self._source.seek(0)
+        if self._resampler is None:
+            while True:
+                count = self._source.read_into(self._buffer)
+                if not count:
+                    return
+                yield self._buffer[:count]
+        else:
+            yield from self._resampled_blocks()
+
+    def _resampled_blocks(self) -> Iterator[np.ndarray]:
+        resampler = self._resampler
+        resampler.reset()
+        # Input chunks are a multiple of `down`, so every chunk resamples to a
+        # whole number of frames; reading past the end yields zeros, which
+        # flush the filter.
+        chunk = max(-(-self.block_size * resampler.down // resampler.up // resampler.down), 1) * resampler.down
+        source = np.empty((chunk, self.channels), dtype=np.float32)
+        pending = np.empty((self.block_size + chunk * resampler.up // resampler.down, self.channels), dtype=np.float32)
+        filled = 0
+        skip = resampler.output_latency
+        remaining = self.frames
+        while remaining > 0:
+            count = self._source.read_into(source)
+            source[count:] = 0.0
+            resampled = resampler.process(source)[skip:]
+            skip = max(skip - chunk * resampler.up // resampler.down, 0)
+            pending[filled:filled + len(resampled)] = resampled
+            filled += len(resampled)
+            # The flushing chunks can resample to more frames than are left
+            while remaining > 0 and (filled >= self.block_size or filled >= remaining):
+                count = min(self.block_size, remaining)
+                self._buffer[:count] = pending[:count]
+                pending[:filled - count] = pending[count:filled]
+                filled -= count
+                remaining -= count
+                yield self._buffer[:count]
+
+class AudioWriter:
+    """
+    Writes an audio file incrementally, one block at a time, with soundfile.
+    """
+    def __init__(self, path: str, sample_rate: int, channels: int, subtype: str = None):
+        """
+        Initializes the AudioWriter.
+
+        Args:
+            path (str): The file to write. Its format follows the extension.
+            sample_rate (int): The sample rate in Hz.
+            channels (int): The number of channels.
+            subtype (str): The soundfile subtype, e.g. 'PCM_24' or 'FLOAT'.
+                           Defaults to the format's default subtype.
+        """
+        import soundfile
+        self.path = path
+        self.samplerate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self._file = soundfile.SoundFile(path, 'w', samplerate=sample_rate, channels=channels, subtype=subtype)
+
+    def write(self, block: np.ndarray):
+        """Appends a block of shape (frames, channels) or (frames,) for mono."""
+        self._file.write(block)
+        self.frames += len(block)
+
+    def close(self):
+        """Flushes and closes the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def render_file(processor, input_path: str, output_path: str, block_size: int = 65536,
+                sample_rate: int = None, subtype: str = None) -> int:
+    """
+    Streams a file through a processor into another file with constant memory.
+
+    Works with any processor providing `process_stream(blocks, sample_rate)`,
+    e.g. HarmonicProcessor, EQProcessor or VSTProcessor. The processor's
+    `latency`, if any, is flushed with silence and trimmed, so the output is
+    aligned with the input and has the same length.
+
+    Args:
+        processor: The processor to apply.
+        input_path (str): The audio file to read (WAV, FLAC, MP3, ...).
+        output_path (str): The file to write.
+        block_size (int): The number of frames per block.
+        sample_rate (int): Resample the input to this rate before processing.
+        subtype (str): The soundfile subtype of the output.
+
+    Returns:
+        int: The number of frames written.
+    """
+    with AudioReader(input_path, block_size, sample_rate) as reader:
+        latency = getattr(processor, 'latency', 0)
+        tail = np.zeros((latency, reader.channels), dtype=np.float32)
+        blocks = itertools.chain(reader.blocks(), [tail] if latency else [])
+        with AudioWriter(output_path, reader.samplerate, reader.channels, subtype) as writer:
+            skip = latency
+            for processed in processor.process_stream(blocks, reader.samplerate):
+                if skip:
+                    trimmed = min(skip, len(processed))
+                    processed = processed[trimmed:]
+                    skip -= trimmed
+                writer.write(processed)
+            return writer.frames
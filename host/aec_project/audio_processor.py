@@ -1,33 +1,315 @@
 # aec_project/audio_processor.py
-from pedalboard import load_plugin, Pedalboard
 import numpy as np
 import os
+import itertools
+import threading
+from typing import Iterable, Iterator
+from .resampling import Oversampler
 
-# Assuming Saturations.py is in a reachable path
-from Saturations.Saturations import add_tanh_harmonics, add_cubic_harmonics, add_fullrect_harmonics, add_asym_clip
+# pedalboard, soundfile, scipy.signal and the Saturations module are imported
+# in the methods that use them: they dominate the import time of this module,
+# and many importers (the CLI, batch scripts) never run those code paths.
+
+class LoadedPlugin:
+    """A loaded plugin instance and the parameter values last pushed to it."""
+    def __init__(self, key: tuple, effect):
+        self.key = key
+        from pedalboard import Pedalboard
+        self.effect = effect
+        self.board = Pedalboard([effect])
+        self.parameter_names = frozenset(getattr(effect, 'parameters', {}).keys())
+        self.applied = {}
+
+    def apply_parameters(self, params: dict) -> dict:
+        """
+        Pushes the parameters whose value differs from the last applied one.
+
+        Args:
+            params (dict): Parameter names and values. Names the plugin does
+                           not expose are ignored.
+
+        Returns:
+            dict: The parameters that were actually set.
+        """
+        changed = {}
+        for param_name, value in params.items():
+            if param_name not in self.parameter_names:
+                continue
+            if param_name in self.applied and self.applied[param_name] == value:
+                continue
+            setattr(self.effect, param_name, value)
+            self.applied[param_name] = value
+            changed[param_name] = value
+        return changed
+
+    def invalidate(self):
+        """Forgets the applied values, e.g. after changing the plugin directly."""
+        self.applied.clear()
+
+class PluginPool:
+    """
+    A keyed pool of loaded plugin instances.
+
+    Instances are keyed by (plugin path, plugin name). `acquire` hands out an
+    idle instance when there is one and only loads a new one otherwise;
+    `release` returns it for reuse. An instance is never shared between two
+    holders at the same time.
+    """
+    def __init__(self, loader=None):
+        """
+        Initializes the PluginPool.
+
+        Args:
+            loader (callable): Called as loader(path, plugin_name=...) to load
+                               an instance. Defaults to pedalboard's `load_plugin`,
+                               imported on the first load.
+        """
+        self._loader = loader
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(plugin_path: str, plugin_name: str = None) -> tuple:
+        """Returns the pool key for a plugin."""
+        return (os.path.abspath(plugin_path), plugin_name)
+
+    def acquire(self, plugin_path: str, plugin_name: str = None) -> LoadedPlugin:
+        """
+        Returns an idle instance of the plugin, loading one if none is idle.
+
+        Args:
+            plugin_path (str): The path to the plugin file or bundle.
+            plugin_name (str): The plugin to pick from a multi-plugin bundle.
+
+        Returns:
+            LoadedPlugin: The acquired instance.
+        """
+        key = self.key(plugin_path, plugin_name)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        return LoadedPlugin(key, self._load(plugin_path, plugin_name))
+
+    def release(self, plugin: LoadedPlugin):
+        """Returns an acquired instance to the pool."""
+        with self._lock:
+            self._idle.setdefault(plugin.key, []).append(plugin)
+
+    def preload(self, plugin_path: str, count: int = 1, plugin_name: str = None):
+        """Loads `count` idle instances ahead of time."""
+        for _ in range(count):
+            self.release(LoadedPlugin(self.key(plugin_path, plugin_name), self._load(plugin_path, plugin_name)))
+
+    def _load(self, plugin_path: str, plugin_name: str = None):
+        """Loads a new instance of the plugin with the pool's loader."""
+        loader = self._loader
+        if loader is None:
+            from pedalboard import load_plugin
+            loader = load_plugin
+        return loader(plugin_path, plugin_name=plugin_name)
+
+    def idle_count(self, plugin_path: str, plugin_name: str = None) -> int:
+        """Returns the number of idle instances of a plugin."""
+        with self._lock:
+            return len(self._idle.get(self.key(plugin_path, plugin_name), []))
+
+    def clear(self):
+        """Drops every idle instance."""
+        with self._lock:
+            self._idle.clear()
+
+# The pool shared by VSTProcessor instances unless another one is passed in.
+DEFAULT_PLUGIN_POOL = PluginPool()
 
 class VSTProcessor:
-    """A processor for applying VST plugins using pedalboard."""
-    def __init__(self, plugin_path: str):
+    """
+    A processor for applying VST plugins using pedalboard.
+
+    The plugin instance is taken from a PluginPool, so creating a processor
+    for a plugin that was used before does not load it again. Call `close`
+    (or use the processor as a context manager) to hand the instance back.
+    """
+    def __init__(self, plugin_path: str, pool: PluginPool = None, plugin_name: str = None):
         if not os.path.exists(plugin_path):
             raise FileNotFoundError(f"Plugin not found at path: {plugin_path}")
-        self.effect = load_plugin(plugin_path)
-        self.board = Pedalboard([self.effect])
+        self.pool = pool or DEFAULT_PLUGIN_POOL
+        self.plugin = self.pool.acquire(plugin_path, plugin_name)
+        self.effect = self.plugin.effect
+        self.board = self.plugin.board
 
-    def set_parameters(self, params: dict):
-        """Sets multiple parameters on the loaded VST plugin."""
-        for param_name, value in params.items():
-            if hasattr(self.effect, param_name):
-                self.effect.parameters.param_name= value
-              #  setattr(self.effect, param_name, value)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Returns the plugin instance to the pool."""
+        if self.plugin is not None:
+            self.pool.release(self.plugin)
+            self.plugin = self.effect = self.board = None
+
+    def set_parameters(self, params: dict) -> dict:
+        """
+        Sets multiple parameters on the loaded VST plugin.
+        Only values that changed since the last call are pushed to the plugin.
+
+        Args:
+            params (dict): Parameter names and values.
+
+        Returns:
+            dict: The parameters that were actually set.
+        """
+        return self.plugin.apply_parameters(params)
 
     def process(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
         """Processes an audio signal through the VST plugin."""
         return self.board(audio, sample_rate)
 
+    def reset(self):
+        """Clears the plugin's internal state (delay lines, envelopes, tails)."""
+        self.board.reset()
+
+    def process_stream(self, blocks: Iterable[np.ndarray], sample_rate: int, reset: bool = True) -> Iterator[np.ndarray]:
+        """
+        Processes a stream of (samples, channels) blocks through the plugin.
+
+        The plugin is not reset between blocks, so its state carries over and
+        the output matches a single call on the concatenated signal (apart
+        from pedalboard's latency compensation, which only applies to whole
+        buffers).
+
+        pedalboard cannot tell the channel axis of a block with no more
+        samples than channels, and padding it would run extra samples through
+        the plugin's state. So the last `channels + 1` input samples are held
+        back and merged with short blocks, and every chunk sent to the plugin
+        is real signal longer than the channel count. The yielded blocks
+        therefore need not match the input block boundaries, but together
+        they cover the input exactly.
+
+        Args:
+            blocks (Iterable[np.ndarray]): The input blocks.
+            sample_rate (int): The sample rate of the signal in Hz.
+            reset (bool): Whether to reset the plugin before the first block.
+
+        Yields:
+            np.ndarray: The processed blocks, in input order.
+
+        Raises:
+            ValueError: If the whole stream has no more samples than channels.
+        """
+        if reset:
+            self.reset()
+        pending = None
+        for block in blocks:
+            num_channels = block.shape[1]
+            reserve = num_channels + 1
+            if pending is not None:
+                if len(pending) <= num_channels or len(block) <= num_channels + reserve:
+                    block = np.concatenate([pending, block])
+                else:
+                    yield self.board(pending, sample_rate, reset=False)
+                pending = None
+            if len(block) > num_channels + reserve:
+                yield self.board(block[:-reserve], sample_rate, reset=False)
+                # Copied because readers may reuse the block's buffer
+                pending = block[-reserve:].copy()
+            else:
+                pending = block.copy()
+        if pending is not None and len(pending):
+            if len(pending) <= pending.shape[1]:
+                raise ValueError(f"Cannot stream {len(pending)} samples of {pending.shape[1]}-channel audio "
+                                 f"through a plugin; the stream must be longer than its channel count.")
+            yield self.board(pending, sample_rate, reset=False)
+
+    def process_file(self, input_path: str, output_path: str, block_size: int = 65536,
+                     reset: bool = True, subtype: str = None):
+        """
+        Processes an audio file block by block with constant memory.
+
+        Blocks are read from `input_path` (WAV, FLAC, MP3, ...), run through
+        the plugin without resetting it between blocks and appended to
+        `output_path`, so only one block is held in memory at a time
+        regardless of the file length.
+
+        Args:
+            input_path (str): The audio file to process.
+            output_path (str): The file to write. Its format follows the extension.
+            block_size (int): The number of samples per block.
+            reset (bool): Whether to reset the plugin before the first block.
+            subtype (str): The soundfile subtype of the output, e.g. 'FLOAT'.
+                           Defaults to the format's default subtype.
+        """
+        from .audio_io import AudioReader, AudioWriter
+        with AudioReader(input_path, block_size) as reader:
+            with AudioWriter(output_path, reader.samplerate, reader.channels, subtype) as writer:
+                for processed in self.process_stream(reader.blocks(), reader.samplerate, reset=reset):
+                    writer.write(processed)
+
+class DCBlocker:
+    """
+    A stateful one-pole DC-blocking filter, vectorized across channels.
+
+    Implements y[n] = x[n] - x[n-1] + r * y[n-1]. The filter state is kept
+    between calls, so consecutive blocks are filtered as one continuous signal.
+    """
+    def __init__(self, sample_rate: int, cutoff_hz: float = 5.0):
+        """
+        Initializes the DCBlocker.
+
+        Args:
+            sample_rate (int): The sample rate of the signal in Hz.
+            cutoff_hz (float): The -3 dB corner of the high-pass in Hz.
+        """
+        self.sample_rate = sample_rate
+        self.cutoff_hz = cutoff_hz
+        r = np.exp(-2 * np.pi * cutoff_hz / sample_rate)
+        self._b = np.array([1.0, -1.0])
+        self._a = np.array([1.0, -r])
+        self._zi = None
+
+    def reset(self):
+        """Clears the filter state."""
+        self._zi = None
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Filters one block of shape (samples,) or (samples, channels).
+
+        Args:
+            block (np.ndarray): The input block.
+
+        Returns:
+            np.ndarray: The filtered block, in the input dtype.
+        """
+        from scipy.signal import lfilter
+        if self._zi is None:
+            self._zi = np.zeros((1,) + block.shape[1:])
+        filtered, self._zi = lfilter(self._b, self._a, block, axis=0, zi=self._zi)
+        return filtered.astype(block.dtype, copy=False)
+
 class HarmonicProcessor:
-    """A processor for adding custom harmonic distortion."""
-    def __init__(self, tanh_amount=1.0,tanh_bias=0.0, cubic_amount=1.0, fullrect_amount=0.0, asym_clip_amount=0.07):
+    """
+    A processor for adding custom harmonic distortion.
+
+    With `oversample` set to 2, 4 or 8 the nonlinearities run at a multiple of
+    the sample rate between polyphase up- and downsampling filters, so the
+    harmonics above Nyquist are filtered out instead of aliasing back. The
+    oversampled path works block by block, so only `block_size * oversample`
+    samples per channel are held at the higher rate.
+
+    `fast_math` replaces the asym clip and tanh stages by a cached lookup
+    table with an absolute error below `max_error`.
+    """
+    def __init__(self, tanh_amount=1.0,tanh_bias=0.0, cubic_amount=1.0, fullrect_amount=0.0, asym_clip_amount=0.07,
+                 oversample=1, block_size=4096, fast_math=False, max_error=1e-4):
+        if oversample not in Oversampler.FACTORS:
+            raise ValueError(f"Oversampling factor must be one of {Oversampler.FACTORS}, got {oversample}.")
+        self.oversample = oversample
+        self.block_size = block_size
+        self.fast_math = fast_math
+        self.max_error = max_error
         self.params = {
             'tanh': tanh_amount,
             'tanh_bias': tanh_bias,
@@ -35,23 +317,157 @@ class HarmonicProcessor:
             'fullrect': fullrect_amount,
             'asym': asym_clip_amount
         }
+        self._scratch = None
+        self._live = None
 
-    def process(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    def process(self, audio: np.ndarray, sample_rate: int, out: np.ndarray = None) -> np.ndarray:
         """
         Applies a series of harmonic distortions.
-        Assumes input is stereo and applies distortion to each channel.
-        """
-        processed_channels = []
-        # Process each channel independently
-        for i in range(audio.shape[1]):
-            channel = audio[:, i]
-            channel = add_asym_clip(channel, amount=self.params['asym'])
-            channel = add_tanh_harmonics(channel, amount=self.params['tanh'], bias=self.params['tanh_bias'])
-            channel = add_cubic_harmonics(channel, amount=self.params['cubic'])
-            channel = add_fullrect_harmonics(channel, amount=self.params['fullrect'])
-            processed_channels.append(channel)
-        
-        return np.stack(processed_channels, axis=-1)
+        All channels are processed at once; DC is removed per channel.
+
+        Args:
+            audio (np.ndarray): The input signal of shape (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+            out (np.ndarray): Optional output array, may be `audio` itself.
+
+        Returns:
+            np.ndarray: The processed signal.
+        """
+        from Saturations.Saturations import saturation_chain
+        if self.oversample == 1:
+            return saturation_chain(audio, out=out, scratch=self._get_scratch(audio), **self._chain_params())
+        return self._process_streamed(audio, sample_rate, out)
+
+    def _process_streamed(self, audio: np.ndarray, sample_rate: int, out: np.ndarray = None) -> np.ndarray:
+        """
+        Runs a whole signal through `process_stream` and trims the latency.
+
+        DC is then removed by the running DC-blocker, and the output stays
+        aligned with the input.
+        """
+        if out is None:
+            out = np.empty_like(audio, dtype=np.result_type(audio.dtype, np.float32))
+        latency = self.latency
+        tail = np.zeros((latency,) + audio.shape[1:], dtype=audio.dtype)
+        blocks = itertools.chain(iter_blocks(audio, self.block_size), [tail])
+        position = -latency
+        for block in self.process_stream(blocks, sample_rate):
+            start = max(position, 0)
+            out[start:position + len(block)] = block[start - position:]
+            position += len(block)
+        return out
+
+    def settings(self) -> dict:
+        """Returns every setting that affects the output, e.g. for cache keys."""
+        return {**self.params, 'oversample': self.oversample, 'block_size': self.block_size,
+                'fast_math': self.fast_math, 'max_error': self.max_error}
+
+    @property
+    def latency(self) -> int:
+        """The delay in samples that `process_stream` adds to its output."""
+        if self.oversample == 1:
+            return 0
+        return Oversampler(self.oversample).latency
+
+    def process_stream(self, blocks: Iterable[np.ndarray], sample_rate: int) -> Iterator[np.ndarray]:
+        """
+        Applies the harmonic chain to a stream of blocks.
+
+        Every block of shape (samples, channels) is processed for all channels
+        at once and yielded as soon as it is ready, so memory use depends on
+        the block size only. The global mean removal of `process` is replaced
+        by a running DC-blocker, which keeps block boundaries seamless. When
+        oversampling, the output is delayed by `latency` samples.
+
+        Args:
+            blocks (Iterable[np.ndarray]): The input blocks.
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Yields:
+            np.ndarray: The processed blocks, in input order.
+        """
+        from Saturations.Saturations import saturation_chain
+        dc_blocker = DCBlocker(sample_rate * self.oversample)
+        oversampler = Oversampler(self.oversample)
+        params = self._chain_params()
+
+        def saturate(block):
+            return saturation_chain(block, dc_filter=dc_blocker.process, scratch=self._get_scratch(block), **params)
+
+        for block in blocks:
+            yield oversampler.process(block, saturate)
+
+    def process_block(self, block: np.ndarray, sample_rate: int, out: np.ndarray) -> np.ndarray:
+        """
+        Processes one block of a live stream into a preallocated buffer.
+
+        Unlike `process_stream`, the DC-blocker and resampler state lives on
+        the processor, so blocks can be pushed one at a time from an audio
+        callback; call `reset_live` before starting a new stream. Without
+        oversampling, the chain runs entirely in `out` and the reused scratch
+        buffer. When oversampling, the output is delayed by `latency` samples.
+
+        Args:
+            block (np.ndarray): The input block of shape (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+            out (np.ndarray): The output buffer, shaped like `block`.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        from Saturations.Saturations import saturation_chain
+        if self._live is None or self._live[0] != sample_rate:
+            self._live = (sample_rate, DCBlocker(sample_rate * self.oversample), Oversampler(self.oversample),
+                          self._chain_params())
+        _, dc_blocker, oversampler, params = self._live
+        if self.oversample == 1:
+            return saturation_chain(block, dc_filter=dc_blocker.process, out=out,
+                                    scratch=self._get_scratch(block), **params)
+
+        def saturate(upsampled):
+            return saturation_chain(upsampled, dc_filter=dc_blocker.process, out=upsampled,
+                                    scratch=self._get_scratch(upsampled), **params)
+
+        np.copyto(out, oversampler.process(block, saturate))
+        return out
+
+    def reset_live(self):
+        """Clears the live stream state of `process_block`."""
+        self._live = None
+
+    def _chain_params(self) -> dict:
+        """Maps `self.params` onto the keyword arguments of `saturation_chain`."""
+        return {
+            'asym': self.params['asym'],
+            'tanh': self.params['tanh'],
+            'tanh_bias': self.params['tanh_bias'],
+            'cubic': self.params['cubic'],
+            'fullrect': self.params['fullrect'],
+            'fast': self.fast_math,
+            'max_error': self.max_error,
+        }
+
+    def _get_scratch(self, audio: np.ndarray) -> np.ndarray:
+        """Returns a work buffer matching `audio`, reused across calls."""
+        dtype = np.result_type(audio.dtype, np.float32)
+        if self._scratch is None or self._scratch.shape != audio.shape or self._scratch.dtype != dtype:
+            self._scratch = np.empty(audio.shape, dtype=dtype)
+        return self._scratch
+
+def iter_blocks(audio: np.ndarray, block_size: int) -> Iterator[np.ndarray]:
+    """
+    Splits an in-memory signal into consecutive blocks along the first axis.
+
+    Args:
+        audio (np.ndarray): The signal to split.
+        block_size (int): The number of samples per block. The last block may
+                          be shorter.
+
+    Yields:
+        np.ndarray: Views into `audio`, one per block.
+    """
+    for start in range(0, len(audio), block_size):
+        yield audio[start:start + block_size]
 
 def get_channev_neutral_params() -> dict:
     """Returns a dictionary of neutral parameters for the CHANNEV.vst3 plugin."""
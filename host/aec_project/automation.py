@@ -0,0 +1,297 @@
+# aec_project/automation.py
+from typing import Dict, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from .audio_processor import DCBlocker, HarmonicProcessor, iter_blocks
+from .equalizer import EQProcessor, _eq_module
+from .resampling import Oversampler
+
+class Envelope:
+    """
+    A breakpoint automation curve: linear (or stepped) moves between
+    (time, value) points, held constant before the first and after the last.
+    """
+    def __init__(self, times: Sequence[float], values: Sequence[float], step: bool = False):
+        """
+        Initializes the Envelope.
+
+        Args:
+            times (Sequence[float]): The breakpoint times in seconds, increasing.
+            values (Sequence[float]): The parameter value at each breakpoint.
+            step (bool): Jump to each value at its breakpoint instead of ramping.
+                         The smoothing of `Automation` still removes the clicks.
+        """
+        self.times = np.asarray(times, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.times.shape != self.values.shape or self.times.ndim != 1 or not len(self.times):
+            raise ValueError("An envelope needs matching, non-empty 1D times and values.")
+        if np.any(np.diff(self.times) < 0):
+            raise ValueError("Envelope times must be increasing.")
+        self.step = step
+
+    @classmethod
+    def constant(cls, value: float) -> 'Envelope':
+        """Returns an envelope holding `value`."""
+        return cls([0.0], [value])
+
+    def __call__(self, times: np.ndarray) -> np.ndarray:
+        """Returns the envelope values at `times` (seconds)."""
+        if self.step:
+            index = np.searchsorted(self.times, times, side='right') - 1
+            return self.values[np.maximum(index, 0)]
+        return np.interp(times, self.times, self.values)
+
+class Smoother:
+    """
+    A stateful one-pole low-pass for control signals, vectorized with lfilter.
+    Like `DCBlocker`, consecutive calls are smoothed as one continuous signal.
+    """
+    def __init__(self, rate: float, time_ms: float = 20.0):
+        """
+        Initializes the Smoother.
+
+        Args:
+            rate (float): The rate of the control signal in Hz (points per second).
+            time_ms (float): The time constant in milliseconds; 0 disables smoothing.
+        """
+        self.rate = rate
+        self.time_ms = time_ms
+        pole = np.exp(-1000.0 / (time_ms * rate)) if time_ms > 0 else 0.0
+        self._b = np.array([1.0 - pole])
+        self._a = np.array([1.0, -pole])
+        self._zi = None
+
+    def reset(self):
+        """Clears the state; the next value is passed through unsmoothed."""
+        self._zi = None
+
+    def process(self, values: np.ndarray) -> np.ndarray:
+        """Smooths one block of control values."""
+        from scipy.signal import lfilter
+        if self._zi is None:
+            # Start settled on the first value instead of ramping up from zero
+            self._zi = np.array([values[0] * -self._a[1]])
+        smoothed, self._zi = lfilter(self._b, self._a, values, zi=self._zi)
+        return smoothed
+
+class Automation:
+    """
+    A set of named envelopes rendered block by block with smoothing.
+
+    `render` must be called with consecutive blocks at one rate so the
+    smoothing runs continuously; call `reset` before starting over.
+    """
+    def __init__(self, envelopes: Dict[str, Envelope], smoothing_ms: float = 20.0):
+        """
+        Initializes the Automation.
+
+        Args:
+            envelopes (Dict[str, Envelope]): The envelope of each automated parameter.
+                                             Plain numbers are held constant.
+            smoothing_ms (float): The smoothing time constant in milliseconds.
+        """
+        self.envelopes = {
+            name: envelope if isinstance(envelope, Envelope) else Envelope.constant(envelope)
+            for name, envelope in envelopes.items()
+        }
+        self.smoothing_ms = smoothing_ms
+        self._smoothers = {}
+
+    def reset(self):
+        """Restarts the smoothing."""
+        self._smoothers = {}
+
+    def render(self, start: int, num_points: int, rate: float, step: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Renders the smoothed envelopes for one block.
+
+        Args:
+            start (int): The index of the first point, in units of `step` samples.
+            num_points (int): The number of points to render.
+            rate (float): The sample rate in Hz.
+            step (int): The number of samples between points, e.g. 1 for
+                        per-sample values or a control interval.
+
+        Returns:
+            Dict[str, np.ndarray]: One array of `num_points` values per parameter.
+        """
+        times = (start + np.arange(num_points)) * (step / rate)
+        rendered = {}
+        for name, envelope in self.envelopes.items():
+            smoother = self._smoothers.get(name)
+            if smoother is None or smoother.rate != rate / step:
+                smoother = self._smoothers[name] = Smoother(rate / step, self.smoothing_ms)
+            rendered[name] = smoother.process(envelope(times))
+        return rendered
+
+class AutomatedHarmonicProcessor(HarmonicProcessor):
+    """
+    A HarmonicProcessor whose amounts follow automation envelopes.
+
+    The envelopes are rendered per sample (at the oversampled rate when
+    oversampling) and passed to `saturation_chain` as arrays, so an automated
+    block costs one vectorized pass like a static one. Automated signals always
+    use the streaming path, with DC removed by the running DC-blocker.
+    """
+    AUTOMATABLE = ('asym', 'tanh', 'tanh_bias', 'cubic', 'fullrect')
+
+    def __init__(self, automation: Dict[str, Envelope], smoothing_ms: float = 20.0, **kwargs):
+        """
+        Initializes the AutomatedHarmonicProcessor.
+
+        Args:
+            automation (Dict[str, Envelope]): Envelopes keyed by 'asym', 'tanh',
+                                              'tanh_bias', 'cubic' or 'fullrect'.
+                                              They override the matching amounts.
+            smoothing_ms (float): The smoothing time constant in milliseconds.
+            **kwargs: The HarmonicProcessor settings. `fast_math` only supports
+                      automating 'cubic' and 'fullrect'.
+        """
+        super().__init__(**kwargs)
+        unknown = set(automation) - set(self.AUTOMATABLE)
+        if unknown:
+            raise ValueError(f"Cannot automate {sorted(unknown)}; expected some of {self.AUTOMATABLE}.")
+        self.automation = Automation(automation, smoothing_ms)
+
+    def process(self, audio: np.ndarray, sample_rate: int, out: np.ndarray = None) -> np.ndarray:
+        """Applies the automated harmonic chain to a whole signal; see `HarmonicProcessor.process`."""
+        return self._process_streamed(audio, sample_rate, out)
+
+    def process_stream(self, blocks: Iterable[np.ndarray], sample_rate: int) -> Iterator[np.ndarray]:
+        """
+        Applies the automated harmonic chain to a stream of blocks.
+        The automation starts at time 0 with the first block.
+
+        Args:
+            blocks (Iterable[np.ndarray]): The input blocks.
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Yields:
+            np.ndarray: The processed blocks, in input order.
+        """
+        from Saturations.Saturations import saturation_chain
+        rate = sample_rate * self.oversample
+        dc_blocker = DCBlocker(rate)
+        oversampler = Oversampler(self.oversample)
+        params = self._chain_params()
+        self.automation.reset()
+        position = 0
+
+        def saturate(block):
+            nonlocal position
+            values = self.automation.render(position, len(block), rate)
+            position += len(block)
+            # Per-sample values broadcast across the channel axis
+            shape = (len(block),) + (1,) * (block.ndim - 1)
+            block_params = {**params, **{name: value.reshape(shape) for name, value in values.items()}}
+            return saturation_chain(block, dc_filter=dc_blocker.process, scratch=self._get_scratch(block), **block_params)
+
+        for block in blocks:
+            yield oversampler.process(block, saturate)
+
+class AutomatedEQProcessor(EQProcessor):
+    """
+    An EQProcessor whose settings follow automation envelopes.
+
+    The smoothed envelopes are sampled every `design_interval` samples and
+    rounded to a fine grid (0.01 dB, 1 cent, 0.001 Q) so each design is looked
+    up in the LRU cache of `design_eq`: a static or revisited setting costs no
+    redesign. Between two design points the biquad coefficients are linearly
+    interpolated per `sub_block` samples, which stays stable (the biquad
+    stability region is convex) and avoids zipper noise. Only 'iir' mode can
+    be automated.
+    """
+    def __init__(self, automation: Dict[str, Envelope], smoothing_ms: float = 20.0,
+                 design_interval: int = 256, sub_block: int = 32, **params):
+        """
+        Initializes the AutomatedEQProcessor.
+
+        Args:
+            automation (Dict[str, Envelope]): Envelopes keyed by EQ setting name
+                                              (e.g. 'Bell1Gain'), overriding `params`.
+            smoothing_ms (float): The smoothing time constant in milliseconds.
+            design_interval (int): The number of samples between filter designs.
+            sub_block (int): The number of samples filtered with one set of
+                             interpolated coefficients; divides `design_interval`.
+            **params: The static EQ settings, see filtres.eq.EQ_DEFAULTS.
+        """
+        if params.pop('mode', 'iir') != 'iir':
+            raise ValueError("Only the 'iir' EQ mode can be automated.")
+        if design_interval % sub_block:
+            raise ValueError("sub_block must divide design_interval.")
+        super().__init__(mode='iir', **params)
+        unknown = set(automation) - set(_eq_module().EQ_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown EQ settings in automation: {sorted(unknown)}")
+        self.automation = Automation(automation, smoothing_ms)
+        self.design_interval = design_interval
+        self.sub_block = sub_block
+
+    def process(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Equalizes a whole signal with the automation starting at time 0."""
+        out = np.empty_like(audio)
+        position = 0
+        for block in self.process_stream(iter_blocks(audio, 65536), sample_rate):
+            out[position:position + len(block)] = block
+            position += len(block)
+        return out
+
+    def process_stream(self, blocks: Iterable[np.ndarray], sample_rate: int) -> Iterator[np.ndarray]:
+        """
+        Equalizes a stream of blocks with no added latency.
+        The automation starts at time 0 with the first block.
+
+        Args:
+            blocks (Iterable[np.ndarray]): The input blocks.
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Yields:
+            np.ndarray: The equalized blocks, in input order.
+        """
+        from scipy.signal import sosfilt
+        interval, sub_block = self.design_interval, self.sub_block
+        self.automation.reset()
+        designs = {}
+        zi = None
+        position = 0
+        for block in blocks:
+            samples = np.asarray(block, dtype=np.float64).reshape(len(block), -1)
+            if zi is None:
+                zi = np.zeros((len(_eq_module().BANDS), 2, samples.shape[1]))
+            # Designs needed by this block: both ends of every interpolated span
+            first = position // interval
+            last = (position + len(samples) - 1) // interval + 1
+            new = [index for index in range(first, last + 1) if index not in designs]
+            if new:
+                values = self.automation.render(new[0], len(new), sample_rate, interval)
+                for offset, index in enumerate(new):
+                    designs[index] = self._design(sample_rate, {name: value[offset] for name, value in values.items()})
+            for index in [index for index in designs if index < first]:
+                del designs[index]
+
+            output = np.empty_like(samples)
+            start = 0
+            while start < len(samples):
+                absolute = position + start
+                stop = min(start + sub_block - absolute % sub_block, len(samples))
+                index, phase = divmod(absolute - absolute % sub_block, interval)
+                weight = phase / interval
+                sos = (1.0 - weight) * designs[index] + weight * designs[index + 1]
+                output[start:stop], zi = sosfilt(sos, samples[start:stop], axis=0, zi=zi)
+                start = stop
+            position += len(samples)
+            yield output.reshape(np.shape(block)).astype(block.dtype, copy=False)
+
+    def _design(self, sample_rate: int, values: Dict[str, float]) -> np.ndarray:
+        """Returns the cached biquad cascade for the static settings overridden by `values`."""
+        settings = dict(self.params)
+        for name, value in values.items():
+            if 'Freq' in name:
+                value = 2.0 ** (np.round(np.log2(value) * 1200) / 1200)
+            elif 'Gain' in name or 'gain' in name:
+                value = np.round(value, 2)
+            else:
+                value = np.round(value, 3)
+            settings[name] = float(value)
+        return _eq_module().design_eq(sample_rate, 'iir', **settings)
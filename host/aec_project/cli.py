@@ -0,0 +1,110 @@
+# aec_project/cli.py
+"""
+Command-line entry point, run from the host directory:
+
+    python -m aec_project render pipelines/process_audio.toml
+    python -m aec_project analyze take.wav --frequency 500
+    python -m aec_project loudness songs/*.wav --output loudness_store
+    python -m aec_project plot analysis_results.npz
+
+Each subcommand imports what it needs when it runs, so `--help` and argument
+errors return without loading scipy, pedalboard, soundfile or matplotlib.
+"""
+import argparse
+import sys
+from typing import Sequence
+
+def _render(args) -> int:
+    from .pipeline import Pipeline, load_config, run_pipelines
+    configs = [load_config(path) for path in args.configs]
+    if len(configs) == 1:
+        results = Pipeline.from_config(configs[0]).run(max_workers=args.workers)
+        outputs = [results]
+    else:
+        outputs = run_pipelines(configs, processes=args.processes)
+    for path, results in zip(args.configs, outputs):
+        print(f"{path}: {', '.join(sorted(results)) or 'done'}")
+    return 0
+
+def _analyze(args) -> int:
+    import numpy as np
+    import soundfile
+    from .data_handler import DataHandler
+    from .signal_analyzer import SignalAnalyzer
+
+    audio, sample_rate = soundfile.read(args.input_file, dtype='float32', always_2d=True)
+    measurement = SignalAnalyzer.measure_harmonics(audio, sample_rate, args.frequency, args.harmonics)
+    levels_db = measurement.levels_db()
+    for channel in range(audio.shape[1]):
+        print(f"Channel {channel}: THD {100 * measurement.thd[channel]:.4f} %, "
+              f"THD+N {100 * measurement.thd_n[channel]:.4f} %")
+        for order, level in enumerate(levels_db[1:, channel], start=2):
+            if not np.isnan(level):
+                print(f"  H{order} ({order * args.frequency:g} Hz): {level:.1f} dB")
+    if args.output:
+        DataHandler.save_analysis_data(args.output, **measurement.to_arrays(args.prefix))
+    return 0
+
+def _loudness(args) -> int:
+    from .data_handler import DataHandler
+    from .loudness import measure_files
+
+    measurements, album = measure_files(args.input_files, block_size=args.block_size)
+    for path, measurement in measurements.items():
+        true_peak = ", ".join(f"{level:.2f}" for level in measurement.true_peak_db())
+        crest = ", ".join(f"{level:.1f}" for level in measurement.crest_factor_db())
+        print(f"{path}: {measurement.integrated:.1f} LUFS, max short-term {measurement.max_short_term:.1f} LUFS, "
+              f"max momentary {measurement.max_momentary:.1f} LUFS, true peak {true_peak} dBTP, "
+              f"crest factor {crest} dB")
+        if args.output:
+            DataHandler.save_analysis_store(args.output, **measurement.to_arrays())
+    if len(measurements) > 1:
+        print(f"Album: {album:.1f} LUFS")
+    return 0
+
+def _plot(args) -> int:
+    from .data_handler import DataHandler
+    from .plotting import plot_fft_comparison
+    try:
+        data = DataHandler.load_analysis_data(args.input_file, run=args.run)
+    except FileNotFoundError:
+        print(f"Error: The file {args.input_file} was not found.", file=sys.stderr)
+        return 1
+    plot_fft_comparison(data)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of the `python -m aec_project` command."""
+    parser = argparse.ArgumentParser(prog="python -m aec_project", description="Render, analyze and plot audio.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="Run pipeline configs (TOML or YAML).")
+    render.add_argument("configs", nargs="+", help="Pipeline config files, e.g. pipelines/process_audio.toml.")
+    render.add_argument("--workers", type=int, help="Threads for the stages of a single pipeline.")
+    render.add_argument("--processes", type=int, help="Processes when running several pipelines.")
+    render.set_defaults(handler=_render)
+
+    analyze = subparsers.add_parser("analyze", help="Measure the harmonics, THD and THD+N of an audio file.")
+    analyze.add_argument("input_file", help="The audio file to analyze.")
+    analyze.add_argument("--frequency", type=float, required=True, help="The fundamental frequency in Hz.")
+    analyze.add_argument("--harmonics", type=int, default=10, help="Harmonics to measure, including the fundamental.")
+    analyze.add_argument("--output", help="Also save the measurement to this .npz file or analysis store.")
+    analyze.add_argument("--prefix", default="", help="Prefix of the saved array names.")
+    analyze.set_defaults(handler=_analyze)
+
+    loudness = subparsers.add_parser("loudness", help="Measure the loudness, true peak and crest factor of audio files.")
+    loudness.add_argument("input_files", nargs="+", help="The audio files, in album order.")
+    loudness.add_argument("--block-size", type=int, default=65536, help="Frames read per block.")
+    loudness.add_argument("--output", help="Append one run per file to this analysis store.")
+    loudness.set_defaults(handler=_loudness)
+
+    plot = subparsers.add_parser("plot", help="Plot the spectra saved by process_audio or a pipeline.")
+    plot.add_argument("input_file", help="The .npz file or analysis store directory.")
+    plot.add_argument("--run", type=int, default=-1, help="The run to plot from an analysis store.")
+    plot.set_defaults(handler=_plot)
+    return parser
+
+def main(argv: Sequence[str] = None) -> int:
+    """Parses the command line and runs the subcommand."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -1,32 +1,209 @@
 # aec_project/data_handler.py
+import hashlib
+import os
+import tempfile
+from collections.abc import Mapping
+from typing import Iterator, List
+
 import numpy as np
 
+class LazyArrays(Mapping):
+    """
+    A read-only mapping of the arrays stored in one run directory.
+
+    Nothing is read until an array is accessed. Uncompressed arrays are
+    memory-mapped, so slicing one only touches the pages it needs; compressed
+    arrays are decompressed individually on first access.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._files = {}
+        for filename in os.listdir(directory):
+            name, extension = os.path.splitext(filename)
+            if extension in ('.npy', '.npz'):
+                self._files[name] = os.path.join(directory, filename)
+        self._loaded = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._loaded:
+            path = self._files[name]
+            if path.endswith('.npy'):
+                self._loaded[name] = np.load(path, mmap_mode='r')
+            else:
+                with np.load(path) as archive:
+                    self._loaded[name] = archive['array']
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._files))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+class AnalysisStore:
+    """
+    A directory-based store for analysis results, one sub-directory per run.
+
+    Every array is its own .npy file (or a single-array .npz file when
+    compression is requested). Appending a run writes a new sub-directory and
+    never rewrites earlier runs, and reading one array does not read the rest.
+
+    Layout:
+        <root>/runs/000000/freq_axis.npy
+        <root>/runs/000000/original_fft.npy
+        <root>/runs/000001/...
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.runs_dir = os.path.join(root, 'runs')
+        os.makedirs(self.runs_dir, exist_ok=True)
+
+    def runs(self) -> List[str]:
+        """Returns the run ids in the order they were appended."""
+        return sorted(name for name in os.listdir(self.runs_dir) if not name.startswith('.'))
+
+    def append_run(self, compress: bool = False, **data_arrays) -> str:
+        """
+        Writes a new run.
+
+        The run is written to a temporary directory and renamed into place,
+        so readers never see a partially written run.
+
+        Args:
+            compress (bool): Store the arrays compressed. Compressed arrays
+                             cannot be memory-mapped.
+            **data_arrays: Keyword arguments where keys are the names and
+                           values are the NumPy arrays to save.
+
+        Returns:
+            str: The id of the new run.
+        """
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.runs_dir)
+        for name, array in data_arrays.items():
+            if compress:
+                np.savez_compressed(os.path.join(staging, f"{name}.npz"), array=array)
+            else:
+                np.save(os.path.join(staging, f"{name}.npy"), array)
+        while True:
+            runs = self.runs()
+            run_id = f"{int(runs[-1]) + 1 if runs else 0:06d}"
+            try:
+                os.rename(staging, os.path.join(self.runs_dir, run_id))
+                return run_id
+            except OSError:
+                # Another writer took this id first
+                continue
+
+    def load_run(self, run=-1) -> LazyArrays:
+        """
+        Returns a lazy mapping of the arrays of one run.
+
+        Args:
+            run (int | str): A run id, or an index into `runs()`; -1 is the latest.
+
+        Returns:
+            LazyArrays: The arrays of the run.
+        """
+        if isinstance(run, int):
+            runs = self.runs()
+            if not runs:
+                raise FileNotFoundError(f"No runs stored in {self.root}")
+            run = runs[run]
+        return LazyArrays(os.path.join(self.runs_dir, run))
+
+class ObjectStore:
+    """
+    A content-addressed store of arrays.
+
+    Each array is saved once as <root>/<digest[:2]>/<digest>.npy, where the
+    digest is the SHA-256 of its dtype, shape and bytes. Storing an identical
+    array again (e.g. a shared frequency axis) costs nothing.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def digest(array: np.ndarray) -> str:
+        """Returns the content digest of an array."""
+        array = np.ascontiguousarray(array)
+        hasher = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode())
+        hasher.update(array.data)
+        return hasher.hexdigest()
+
+    def path(self, digest: str) -> str:
+        """Returns the file path of an object."""
+        return os.path.join(self.root, digest[:2], f"{digest}.npy")
+
+    def put(self, array: np.ndarray) -> str:
+        """Stores an array if it is not present yet and returns its digest."""
+        array = np.asarray(array)
+        digest = self.digest(array)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, staging = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as file:
+                np.save(file, array)
+            os.replace(staging, path)
+        return digest
+
+    def get(self, digest: str) -> np.ndarray:
+        """Returns a stored array, memory-mapped."""
+        return np.load(self.path(digest), mmap_mode='r')
+
 class DataHandler:
     """Handles saving and loading of analysis data."""
 
     @staticmethod
-    def save_analysis_data(filepath: str, **data_arrays):
+    def save_analysis_data(filepath: str, compress: bool = False, **data_arrays):
         """
-        Saves multiple NumPy arrays to a single compressed .npz file.
+        Saves multiple NumPy arrays to a single .npz file.
 
         Args:
             filepath (str): The path to save the file to.
+            compress (bool): Whether to write a compressed archive.
             **data_arrays: Keyword arguments where keys are the names and
                            values are the NumPy arrays to save.
         """
-        np.savez(filepath, **data_arrays)
+        if compress:
+            np.savez_compressed(filepath, **data_arrays)
+        else:
+            np.savez(filepath, **data_arrays)
         print(f"Analysis data saved to {filepath}")
 
     @staticmethod
-    def load_analysis_data(filepath: str) -> dict:
+    def save_analysis_store(dirpath: str, compress: bool = False, **data_arrays) -> str:
+        """
+        Appends the arrays as a new run of the AnalysisStore at `dirpath`.
+
+        Args:
+            dirpath (str): The store directory; created if missing.
+            compress (bool): Whether to store the arrays compressed.
+            **data_arrays: Keyword arguments where keys are the names and
+                           values are the NumPy arrays to save.
+
+        Returns:
+            str: The id of the new run.
+        """
+        run_id = AnalysisStore(dirpath).append_run(compress=compress, **data_arrays)
+        print(f"Analysis data saved to {dirpath} (run {run_id})")
+        return run_id
+
+    @staticmethod
+    def load_analysis_data(filepath: str, run=-1) -> Mapping:
         """
-        Loads data from a .npz file into a dictionary of arrays.
+        Loads data from a .npz file or an AnalysisStore directory.
 
         Args:
-            filepath (str): The path to the .npz file.
+            filepath (str): The path to the .npz file or store directory.
+            run (int | str): For a store, the run to load; -1 is the latest.
 
         Returns:
-            dict: A dictionary where keys are the names of the saved arrays
-                  and values are the loaded NumPy arrays.
+            Mapping: A mapping where keys are the names of the saved arrays
+                     and values are the loaded NumPy arrays. Arrays are read
+                     on access.
         """
-        return np.load(filepath)
\ No newline at end of file
+        if os.path.isdir(filepath):
+            return AnalysisStore(filepath).load_run(run)
+        return np.load(filepath)
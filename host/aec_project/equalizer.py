@@ -0,0 +1,119 @@
+# aec_project/equalizer.py
+from typing import Iterable, Iterator
+
+import numpy as np
+
+def _eq_module():
+    """
+    Imports filtres.eq, which lives next to host/ at the repository root.
+
+    The repository root must be importable: `python -m aec_project` adds it,
+    other entry points need it on PYTHONPATH.
+    """
+    from filtres import eq
+    return eq
+
+class EQProcessor:
+    """
+    A processor for the parametric EQ of filtres/eq.py (LC, Bell1, Bell2, HS,
+    input and output gain), with the same interface as HarmonicProcessor.
+
+    'iir' mode runs the bands as cascaded biquads with no latency; 'fir' mode
+    applies a linear-phase FIR with the same magnitude response. The settings
+    use the plugin layout names, e.g. EQProcessor(Bell1Freq=300, Bell1Gain=6).
+    """
+    def __init__(self, mode: str = 'iir', fir_order: int = 2048, block_size: int = 512, **params):
+        """
+        Initializes the EQProcessor.
+
+        Args:
+            mode (str): 'iir' or 'fir'.
+            fir_order (int): The number of FIR taps in 'fir' mode.
+            block_size (int): The convolution partition size in 'fir' mode.
+            **params: The EQ settings, see filtres.eq.EQ_DEFAULTS.
+        """
+        self.mode = mode
+        self.fir_order = fir_order
+        self.block_size = block_size
+        self.params = dict(params)
+        self._eq = None
+
+    def settings(self) -> dict:
+        """Returns every setting that affects the output, e.g. for cache keys."""
+        return {**_eq_module().EQ_DEFAULTS, **self.params, 'mode': self.mode, 'fir_order': self.fir_order}
+
+    def set_parameters(self, params: dict) -> dict:
+        """Updates the EQ settings and returns the ones that changed."""
+        changed = {name: value for name, value in params.items() if self.params.get(name) != value}
+        self.params.update(changed)
+        if self._eq is not None and changed:
+            self._eq.set_parameters(changed)
+        return changed
+
+    @property
+    def latency(self) -> int:
+        """The delay in samples that `process_stream` adds to its output."""
+        if self.mode == 'iir':
+            return 0
+        return self.fir_order // 2 + self.block_size
+
+    def process(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Equalizes a whole signal, aligned with the input.
+
+        Args:
+            audio (np.ndarray): The input signal of shape (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Returns:
+            np.ndarray: The equalized signal, in the input dtype.
+        """
+        return self._get_eq(audio, sample_rate).filter(audio).astype(audio.dtype, copy=False)
+
+    def process_stream(self, blocks: Iterable[np.ndarray], sample_rate: int) -> Iterator[np.ndarray]:
+        """
+        Equalizes a stream of blocks, keeping the filter state between blocks.
+        In 'fir' mode the output is delayed by `latency` samples.
+
+        Args:
+            blocks (Iterable[np.ndarray]): The input blocks.
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Yields:
+            np.ndarray: The equalized blocks, in input order.
+        """
+        eq = None
+        for block in blocks:
+            if eq is None:
+                eq = self._get_eq(block, sample_rate)
+                eq.reset()
+            yield eq.process(block).astype(block.dtype, copy=False)
+
+    def process_block(self, block: np.ndarray, sample_rate: int, out: np.ndarray) -> np.ndarray:
+        """
+        Equalizes one block of a live stream into a preallocated buffer,
+        keeping the filter state between calls; see `HarmonicProcessor.process_block`.
+
+        Args:
+            block (np.ndarray): The input block of shape (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+            out (np.ndarray): The output buffer, shaped like `block`.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        np.copyto(out, self._get_eq(block, sample_rate).process(block), casting='unsafe')
+        return out
+
+    def reset_live(self):
+        """Clears the filter state used by `process_block`."""
+        if self._eq is not None:
+            self._eq.reset()
+
+    def _get_eq(self, audio: np.ndarray, sample_rate: int):
+        """Returns the ParametricEQ for this sample rate and channel count, reused across calls."""
+        channels = audio.shape[1] if audio.ndim > 1 else 1
+        if self._eq is None or self._eq.sample_rate != sample_rate or self._eq.channels != channels:
+            self._eq = _eq_module().ParametricEQ(sample_rate, channels, self.mode, self.fir_order,
+                                                 self.block_size, **self.params)
+        return self._eq
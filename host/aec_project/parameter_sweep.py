@@ -0,0 +1,103 @@
+# aec_project/parameter_sweep.py
+import numpy as np
+from typing import Callable, Iterator, Tuple
+
+class ParameterSweep:
+    """
+    Evaluates many HarmonicProcessor settings on one signal at once.
+
+    The settings are laid out along a leading "points" axis and the
+    saturation chain is run as one broadcast (points x samples) computation.
+    Points are processed in chunks so that memory use stays bounded no matter
+    how large the grid is.
+    """
+    PARAMETERS = {
+        'tanh_amount': 'tanh',
+        'tanh_bias': 'tanh_bias',
+        'cubic_amount': 'cubic',
+        'fullrect_amount': 'fullrect',
+        'asym_clip_amount': 'asym',
+    }
+    DEFAULTS = {'tanh_amount': 1.0, 'tanh_bias': 0.0, 'cubic_amount': 1.0, 'fullrect_amount': 0.0, 'asym_clip_amount': 0.07}
+
+    def __init__(self, grid: bool = True, max_bytes: int = 256 * 2 ** 20, **param_values):
+        """
+        Initializes the ParameterSweep.
+
+        Args:
+            grid (bool): If True, every combination of the given values is
+                         evaluated (outer product). If False, the value arrays
+                         are broadcast against each other and zipped.
+            max_bytes (int): Upper bound for the working memory of one chunk.
+            **param_values: Values for the HarmonicProcessor arguments
+                            (tanh_amount, tanh_bias, cubic_amount,
+                            fullrect_amount, asym_clip_amount). Missing ones
+                            keep the HarmonicProcessor defaults.
+        """
+        unknown = set(param_values) - set(self.PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        self.max_bytes = max_bytes
+        values = {name: np.atleast_1d(np.asarray(param_values.get(name, default), dtype=np.float64))
+                  for name, default in self.DEFAULTS.items()}
+        if grid:
+            columns = np.meshgrid(*values.values(), indexing='ij')
+        else:
+            columns = np.broadcast_arrays(*values.values())
+        self.points = {name: column.ravel() for name, column in zip(values, columns)}
+
+    def __len__(self) -> int:
+        return len(self.points['tanh_amount'])
+
+    def chunk_size(self, audio: np.ndarray) -> int:
+        """Returns how many points fit into `max_bytes` for the given signal."""
+        bytes_per_point = 2 * audio.size * np.result_type(audio.dtype, np.float32).itemsize
+        return max(1, int(self.max_bytes // bytes_per_point))
+
+    def run(self, audio: np.ndarray, sample_rate: int) -> Iterator[Tuple[slice, np.ndarray]]:
+        """
+        Renders the sweep chunk by chunk.
+
+        Args:
+            audio (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+
+        Yields:
+            Tuple[slice, np.ndarray]: The range of points in the chunk and the
+                                      rendered signals with shape
+                                      (points,) + audio.shape. The array is
+                                      reused for the next chunk.
+        """
+        from Saturations.Saturations import saturation_chain
+        chunk = min(self.chunk_size(audio), len(self))
+        dtype = np.result_type(audio.dtype, np.float32)
+        out = np.empty((chunk,) + audio.shape, dtype=dtype)
+        scratch = np.empty_like(out)
+        expand = (slice(None),) + (np.newaxis,) * audio.ndim
+        for start in range(0, len(self), chunk):
+            points = slice(start, min(start + chunk, len(self)))
+            count = points.stop - points.start
+            params = {key: self.points[name][points][expand].astype(dtype)
+                      for name, key in self.PARAMETERS.items()}
+            yield points, saturation_chain(audio, out=out[:count], scratch=scratch[:count], axis=1, **params)
+
+    def map(self, audio: np.ndarray, sample_rate: int, reducer: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Renders the sweep and reduces every chunk, e.g. to a few measurements.
+
+        Args:
+            audio (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal in Hz.
+            reducer (Callable): Maps a (points,) + audio.shape array to an
+                                array with one row per point.
+
+        Returns:
+            np.ndarray: The reduced results for all points, in sweep order.
+        """
+        results = None
+        for points, rendered in self.run(audio, sample_rate):
+            reduced = np.asarray(reducer(rendered))
+            if results is None:
+                results = np.empty((len(self),) + reduced.shape[1:], dtype=reduced.dtype)
+            results[points] = reduced
+        return results
@@ -0,0 +1,240 @@
+# aec_project/pipeline.py
+import concurrent.futures
+import os
+from typing import Callable, Dict, List, Sequence
+
+from .audio_generator import SignalGenerator
+from .audio_processor import HarmonicProcessor, VSTProcessor, get_channev_neutral_params
+from .data_handler import DataHandler
+from .equalizer import EQProcessor
+from .signal_analyzer import SignalAnalyzer
+
+class Stage:
+    """One node of a pipeline: a callable and the names of the stages it consumes."""
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = ()):
+        """
+        Initializes the Stage.
+
+        Args:
+            name (str): The unique stage name.
+            func (Callable): Called with the outputs of `inputs`, in order.
+            inputs (Sequence[str]): The names of the upstream stages.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+
+def _sine_stage(sample_rate: int, duration: float, frequency: float, amplitude: float = 0.5) -> Callable:
+    generator = SignalGenerator(duration=duration, sample_rate=sample_rate)
+    return lambda: generator.generate_sine(frequency=frequency, amplitude=amplitude)
+
+def _vst_stage(sample_rate: int, plugin_path: str, neutral: bool = True, params: dict = None) -> Callable:
+    def process(audio):
+        with VSTProcessor(plugin_path=plugin_path) as processor:
+            processor.set_parameters({**(get_channev_neutral_params() if neutral else {}), **(params or {})})
+            return processor.process(audio, sample_rate)
+    return process
+
+def _harmonics_stage(sample_rate: int, **params) -> Callable:
+    processor = HarmonicProcessor(**params)
+    return lambda audio: processor.process(audio, sample_rate)
+
+def _eq_stage(sample_rate: int, **params) -> Callable:
+    processor = EQProcessor(**params)
+    return lambda audio: processor.process(audio, sample_rate)
+
+def _spectra_stage(sample_rate: int, names: Sequence[str] = None, channel: int = 0, window: str = None,
+                   bands: int = None) -> Callable:
+    def analyze(*signals):
+        freq_axis, spectra = SignalAnalyzer.compute_spectra(signals, sample_rate, window=window)
+        if spectra.ndim == 3:
+            spectra = spectra[..., channel]
+        if bands:
+            freq_axis, spectra = SignalAnalyzer.decimate_spectrum(freq_axis, spectra, bands)
+        if names is None:
+            return {'freq_axis': freq_axis, 'spectra': spectra}
+        return {'freq_axis': freq_axis, **dict(zip(names, spectra))}
+    return analyze
+
+def _harmonic_measurement_stage(sample_rate: int, fundamental: float, num_harmonics: int = 10,
+                                prefix: str = "") -> Callable:
+    return lambda audio: SignalAnalyzer.measure_harmonics(audio, sample_rate, fundamental, num_harmonics).to_arrays(prefix)
+
+def _save_stage(sample_rate: int, path: str, names: Sequence[str] = None) -> Callable:
+    def save(*outputs):
+        arrays = {}
+        for index, output in enumerate(outputs):
+            if isinstance(output, dict):
+                arrays.update(output)
+            else:
+                arrays[names[index] if names else f"input_{index}"] = output
+        if os.path.isdir(path) or not path.endswith('.npz'):
+            return DataHandler.save_analysis_store(path, **arrays)
+        DataHandler.save_analysis_data(path, **arrays)
+        return path
+    return save
+
+# Stage types available in pipeline configs. Each factory receives the
+# pipeline sample rate and the stage's config keys and returns the callable.
+STAGE_TYPES: Dict[str, Callable[..., Callable]] = {
+    'sine': _sine_stage,
+    'vst': _vst_stage,
+    'harmonics': _harmonics_stage,
+    'eq': _eq_stage,
+    'spectra': _spectra_stage,
+    'harmonic_measurement': _harmonic_measurement_stage,
+    'save': _save_stage,
+}
+
+class Pipeline:
+    """
+    A DAG of processing stages run concurrently in a thread pool.
+
+    A stage starts as soon as all its inputs are available, so independent
+    branches (e.g. the VST and the harmonic branch) run at the same time.
+    Outputs are handed to downstream stages by reference, without copying;
+    stages must therefore not modify their inputs in place. NumPy, SciPy and
+    pedalboard release the GIL in their heavy loops, so threads are enough to
+    keep several cores busy within one pipeline.
+    """
+    def __init__(self, sample_rate: int = 44100):
+        self.sample_rate = sample_rate
+        self.stages: Dict[str, Stage] = {}
+        self.outputs: List[str] = []
+
+    def add_stage(self, name: str, func: Callable, inputs: Sequence[str] = ()) -> Stage:
+        """Adds a stage; see `Stage`."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage name '{name}'.")
+        self.stages[name] = Stage(name, func, inputs)
+        return self.stages[name]
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'Pipeline':
+        """
+        Builds a pipeline from a config dict.
+
+        Example (TOML):
+            sample_rate = 44100
+            outputs = ["thd"]
+
+            [stages.sine]
+            type = "sine"
+            duration = 2.0
+            frequency = 500
+
+            [stages.harmonics]
+            type = "harmonics"
+            inputs = ["sine"]
+            tanh_bias = -0.5
+
+        Args:
+            config (dict): 'sample_rate', optional 'outputs' (the stage results
+                           returned by `run`) and a 'stages' table whose entries
+                           name a `type` from STAGE_TYPES, their `inputs` and
+                           the type's parameters.
+
+        Returns:
+            Pipeline: The pipeline.
+        """
+        pipeline = cls(sample_rate=config.get('sample_rate', 44100))
+        for name, stage_config in config['stages'].items():
+            stage_config = dict(stage_config)
+            stage_type = stage_config.pop('type')
+            inputs = stage_config.pop('inputs', [])
+            if stage_type not in STAGE_TYPES:
+                raise ValueError(f"Unknown stage type '{stage_type}' for stage '{name}'.")
+            pipeline.add_stage(name, STAGE_TYPES[stage_type](pipeline.sample_rate, **stage_config), inputs)
+        pipeline.outputs = list(config.get('outputs', []))
+        return pipeline
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Pipeline':
+        """Builds a pipeline from a .toml, .yaml or .yml config file."""
+        return cls.from_config(load_config(path))
+
+    def order(self) -> List[str]:
+        """Returns the stage names in a valid execution order, checking the graph."""
+        order, state = [], {}
+
+        def visit(name: str, path: tuple):
+            if name not in self.stages:
+                raise ValueError(f"Stage '{path[-1]}' depends on unknown stage '{name}'.")
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(path + (name,))}")
+            state[name] = 'visiting'
+            for dependency in self.stages[name].inputs:
+                visit(dependency, path + (name,))
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    def run(self, max_workers: int = None) -> dict:
+        """
+        Runs all stages, each as soon as its inputs are ready.
+
+        Args:
+            max_workers (int): The thread pool size. Defaults to the CPU count.
+
+        Returns:
+            dict: The results of the stages listed in `outputs`, or of all
+                  stages when `outputs` is empty.
+        """
+        pending = self.order()
+        results = {}
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            while pending or running:
+                for name in [name for name in pending if all(dep in results for dep in self.stages[name].inputs)]:
+                    stage = self.stages[name]
+                    running[executor.submit(stage.func, *(results[dep] for dep in stage.inputs))] = name
+                    pending.remove(name)
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+        if self.outputs:
+            return {name: results[name] for name in self.outputs}
+        return results
+
+def load_config(path: str) -> dict:
+    """Reads a pipeline config from a TOML or YAML file."""
+    if path.endswith(('.yaml', '.yml')):
+        import yaml
+        with open(path) as file:
+            return yaml.safe_load(file)
+    import tomllib
+    with open(path, 'rb') as file:
+        return tomllib.load(file)
+
+def _run_config(config: dict) -> dict:
+    pipeline = Pipeline.from_config(config)
+    results = pipeline.run()
+    return results if pipeline.outputs else {}
+
+def run_pipelines(configs: Sequence[dict], processes: int = None) -> List[dict]:
+    """
+    Runs many independent pipelines in a process pool, e.g. a regression suite.
+
+    Each pipeline runs in one worker process (with its own thread pool), and
+    only the results listed in its `outputs` are sent back to the caller.
+
+    Args:
+        configs (Sequence[dict]): Pipeline configs, see `Pipeline.from_config`.
+        processes (int): The number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        List[dict]: The outputs of each pipeline, in input order.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_run_config, configs))
@@ -0,0 +1,31 @@
+# aec_project/plotting.py
+import numpy as np
+
+def plot_fft_comparison(data: dict):
+    """
+    Plots the FFT data from the loaded dictionary.
+
+    matplotlib is imported here rather than at module load, so importing the
+    plotting helpers (or running `--help`) does not pay for it.
+
+    Args:
+        data (dict): A dictionary containing FFT data arrays.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+
+    # Convert magnitudes to dB, adding a small epsilon to avoid log(0)
+    epsilon = 1e-9
+
+    plt.semilogx(data['freq_axis'], 20 * np.log10(data['effected_harm_fft'] + epsilon), label='Harmonics Added', linestyle='--')
+    plt.semilogx(data['freq_axis'], 20 * np.log10(data['effected_vst_fft'] + epsilon), label='VST Processed')
+    plt.semilogx(data['freq_axis'], 20 * np.log10(data['original_fft'] + epsilon), label='Original')
+
+    plt.title('FFT Comparison of Audio Signals')
+    plt.xlabel('Frequency (Hz)')
+    plt.ylabel('Magnitude (dB)')
+    plt.legend()
+    plt.grid(True)
+    plt.ylim(bottom=-60) # Set a floor for better visualization
+    plt.show()
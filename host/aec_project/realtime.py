@@ -0,0 +1,344 @@
+# aec_project/realtime.py
+import itertools
+import time
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .audio_processor import iter_blocks
+
+class RingBuffer:
+    """
+    A preallocated single-producer/single-consumer ring buffer of audio frames.
+
+    One thread may `write` while another `reads` without locks: the producer
+    only advances `_write_index` after copying the frames in, the consumer only
+    advances `_read_index` after copying them out, and each index is written by
+    one side only. The indices grow without wrapping, so full and empty states
+    are never ambiguous.
+    """
+    def __init__(self, capacity: int, channels: int, dtype=np.float32):
+        """
+        Initializes the RingBuffer.
+
+        Args:
+            capacity (int): The number of frames the buffer holds.
+            channels (int): The number of channels per frame.
+            dtype: The sample type.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((capacity, channels), dtype=dtype)
+        self._write_index = 0
+        self._read_index = 0
+
+    @property
+    def readable(self) -> int:
+        """The number of frames available to the consumer."""
+        return self._write_index - self._read_index
+
+    @property
+    def writable(self) -> int:
+        """The number of frames the producer can write without overwriting."""
+        return self.capacity - self.readable
+
+    def write(self, frames: np.ndarray) -> int:
+        """
+        Copies as many frames as fit into the buffer (producer side).
+
+        Args:
+            frames (np.ndarray): Frames of shape (count, channels).
+
+        Returns:
+            int: The number of frames written.
+        """
+        count = min(len(frames), self.writable)
+        start = self._write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = frames[:first]
+        self._data[:count - first] = frames[first:count]
+        self._write_index += count
+        return count
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copies up to len(out) frames into `out` (consumer side).
+
+        Args:
+            out (np.ndarray): The destination, of shape (count, channels).
+
+        Returns:
+            int: The number of frames read; the rest of `out` is left untouched.
+        """
+        count = min(len(out), self.readable)
+        start = self._read_index % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:count] = self._data[:count - first]
+        self._read_index += count
+        return count
+
+class EngineStats:
+    """Timing and xrun statistics of a RealtimeEngine, updated without allocating."""
+    def __init__(self, history: int = 4096):
+        """
+        Initializes the EngineStats.
+
+        Args:
+            history (int): The number of recent callback durations kept for percentiles.
+        """
+        self.durations = np.zeros(history)
+        self.reset()
+
+    def reset(self):
+        """Clears all statistics."""
+        self.callbacks = 0
+        self.underruns = 0
+        self.overruns = 0
+        self.deadline_misses = 0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.durations[:] = 0.0
+
+    def record(self, duration: float, deadline: float):
+        """Records the processing time of one callback against its deadline (seconds)."""
+        self.durations[self.callbacks % len(self.durations)] = duration
+        self.callbacks += 1
+        self.total_duration += duration
+        if duration > self.max_duration:
+            self.max_duration = duration
+        if duration > deadline:
+            self.deadline_misses += 1
+
+    def summary(self, block_duration: float) -> dict:
+        """
+        Returns the statistics as a dict.
+
+        Args:
+            block_duration (float): The duration of one block in seconds, used to
+                                    express processing times as a DSP load.
+
+        Returns:
+            dict: Counts of callbacks, underruns, overruns and deadline misses,
+                  and the mean, 99th percentile and maximum load.
+        """
+        recent = self.durations[:min(self.callbacks, len(self.durations))]
+        return {
+            'callbacks': self.callbacks,
+            'underruns': self.underruns,
+            'overruns': self.overruns,
+            'deadline_misses': self.deadline_misses,
+            'mean_load': self.total_duration / max(self.callbacks, 1) / block_duration,
+            'p99_load': float(np.percentile(recent, 99)) / block_duration if len(recent) else 0.0,
+            'max_load': self.max_duration / block_duration,
+        }
+
+class SimulatedClock:
+    """A manually advanced clock, for running the engine headless and deterministically."""
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float):
+        """Moves the clock forward."""
+        self.time += seconds
+
+class RealtimeEngine:
+    """
+    Runs a chain of processors block by block from an audio callback.
+
+    Input frames are pushed into `input_ring` by a producer (an input device,
+    a file reader, ...). Each `callback` pulls one block from it, runs it
+    through every processor's `process_block` into preallocated buffers and
+    writes the result into the device buffer, and into `output_ring` for a
+    monitoring consumer when `monitor` is set. Nothing is allocated by the
+    engine itself in the callback; an input underrun is filled with silence
+    and counted, as is a full output ring and a callback that takes longer
+    than `deadline` (by default the duration of a block).
+
+    The callback has the signature of sounddevice's OutputStream callbacks,
+    so the engine can drive a real device as well as the stand-ins below.
+    """
+    def __init__(self, processors: Sequence, sample_rate: int = 44100, block_size: int = 256, channels: int = 2,
+                 buffer_blocks: int = 4, deadline: float = None, timer: Callable[[], float] = time.perf_counter,
+                 monitor: bool = False):
+        """
+        Initializes the RealtimeEngine.
+
+        Args:
+            processors (Sequence): Objects with `process_block(block, sample_rate, out)`,
+                                   e.g. HarmonicProcessor and EQProcessor.
+            sample_rate (int): The sample rate in Hz.
+            block_size (int): The number of frames per callback.
+            channels (int): The number of channels.
+            buffer_blocks (int): The capacity of the ring buffers, in blocks.
+            deadline (float): The processing time budget per callback in seconds.
+                              Defaults to the block duration.
+            timer (Callable): The clock used to time callbacks, e.g. a SimulatedClock.
+            monitor (bool): Also copy the output into `output_ring`.
+        """
+        self.processors = list(processors)
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.channels = channels
+        self.block_duration = block_size / sample_rate
+        self.deadline = self.block_duration if deadline is None else deadline
+        self.timer = timer
+        self.input_ring = RingBuffer(block_size * buffer_blocks, channels)
+        self.output_ring = RingBuffer(block_size * buffer_blocks, channels) if monitor else None
+        self.stats = EngineStats()
+        self._buffers = [np.zeros((block_size, channels), dtype=np.float32) for _ in range(2)]
+        self.prepare()
+
+    @property
+    def latency(self) -> int:
+        """The delay in frames added by the processors (excluding buffering)."""
+        return sum(getattr(processor, 'latency', 0) for processor in self.processors)
+
+    def prepare(self):
+        """
+        Runs one block of silence through the chain.
+
+        Processors allocate their filters and work buffers on their first
+        block, so this keeps those allocations out of the first callback.
+        Silence leaves the filter states as they were.
+        """
+        silence, work = self._buffers
+        silence[:] = 0.0
+        for processor in self.processors:
+            processor.process_block(silence, self.sample_rate, out=work)
+        self.stats.reset()
+
+    def callback(self, outdata: np.ndarray, frames: int, time_info=None, status=None):
+        """
+        Processes one block into `outdata`.
+
+        Args:
+            outdata (np.ndarray): The device buffer, (frames, channels).
+            frames (int): The number of frames; must equal `block_size`.
+            time_info: Unused, for sounddevice compatibility.
+            status: Unused, for sounddevice compatibility.
+        """
+        start = self.timer()
+        block, work = self._buffers
+        received = self.input_ring.read(block)
+        if received < frames:
+            block[received:] = 0.0
+            self.stats.underruns += 1
+        for processor in self.processors:
+            processor.process_block(block, self.sample_rate, out=work)
+            block, work = work, block
+        outdata[:] = block
+        if self.output_ring is not None and self.output_ring.write(block) < frames:
+            self.stats.overruns += 1
+        self.stats.record(self.timer() - start, self.deadline)
+
+    def summary(self) -> dict:
+        """Returns the engine statistics; see `EngineStats.summary`."""
+        return self.stats.summary(self.block_duration)
+
+class ArrayDevice:
+    """
+    A headless stand-in for an audio device, playing an array through an engine.
+
+    Each period, the device pushes the input frames that have "arrived" into
+    the engine's input ring, possibly in irregular chunks, calls the engine
+    callback on schedule and collects the output. The periods follow a
+    SimulatedClock, so runs are fast and reproducible.
+    """
+    def __init__(self, engine: RealtimeEngine, clock: SimulatedClock = None, chunk_size: int = None,
+                 jitter: float = 0.0, seed: int = 0):
+        """
+        Initializes the ArrayDevice.
+
+        Args:
+            engine (RealtimeEngine): The engine to drive.
+            clock (SimulatedClock): The device timeline; a new one by default.
+            chunk_size (int): The size of the input chunks pushed by the producer.
+                              Defaults to the engine block size.
+            jitter (float): The probability that the producer delivers a chunk
+                            one period late, to exercise underruns.
+            seed (int): The seed of the jitter.
+        """
+        self.engine = engine
+        self.clock = clock or SimulatedClock()
+        self.chunk_size = chunk_size or engine.block_size
+        self.jitter = jitter
+        self._rng = np.random.default_rng(seed)
+
+    def run(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Plays `audio` through the engine.
+
+        Args:
+            audio (np.ndarray): The input of shape (frames, channels).
+
+        Returns:
+            np.ndarray: The engine output, float32, with as many frames as `audio`.
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(len(audio), -1)
+        output = np.empty((len(audio), self.engine.channels), dtype=np.float32)
+        for start, block in self.stream(iter_blocks(audio, self.chunk_size), len(audio)):
+            output[start:start + len(block)] = block[:len(output) - start]
+        return output
+
+    def stream(self, chunks, num_frames: int):
+        """
+        Drives the engine from an iterator of input chunks.
+
+        Args:
+            chunks (Iterator[np.ndarray]): The input chunks, (frames, channels).
+            num_frames (int): The total number of input frames.
+
+        Yields:
+            Tuple[int, np.ndarray]: The output position and block of each callback.
+                                    The block buffer is reused between callbacks.
+        """
+        engine = self.engine
+        outdata = np.zeros((engine.block_size, engine.channels), dtype=np.float32)
+        # Like a real device, the last period is completed with silence
+        chunks = itertools.chain(chunks, [np.zeros((engine.block_size, engine.channels), dtype=np.float32)])
+        pending = None
+        delivered = 0
+        for position in range(0, num_frames, engine.block_size):
+            # The producer delivers everything due by the end of this period
+            # unless it is running late
+            while delivered < position + engine.block_size:
+                if pending is None:
+                    pending = next(chunks, None)
+                    if pending is None:
+                        break
+                if self.jitter and self._rng.random() < self.jitter:
+                    break
+                written = engine.input_ring.write(pending)
+                delivered += written
+                pending = pending[written:] if written < len(pending) else None
+                if written == 0:
+                    break
+            engine.callback(outdata, engine.block_size)
+            self.clock.advance(engine.block_duration)
+            yield position, outdata
+
+class FileDevice(ArrayDevice):
+    """An ArrayDevice that reads its input from a file and writes the output to another."""
+
+    def run_file(self, input_path: str, output_path: str, subtype: str = None):
+        """
+        Plays a file through the engine with constant memory use.
+
+        Args:
+            input_path (str): The input audio file; its channel count must match the engine.
+            output_path (str): The output audio file.
+            subtype (str): The output sample format; defaults to the input one.
+        """
+        import soundfile
+        with soundfile.SoundFile(input_path) as infile:
+            if infile.channels != self.engine.channels:
+                raise ValueError(f"{input_path} has {infile.channels} channels, the engine {self.engine.channels}.")
+            chunks = infile.blocks(blocksize=self.chunk_size, dtype='float32', always_2d=True)
+            with soundfile.SoundFile(output_path, 'w', samplerate=infile.samplerate, channels=infile.channels,
+                                     subtype=subtype or infile.subtype) as outfile:
+                for start, block in self.stream(chunks, infile.frames):
+                    outfile.write(block[:infile.frames - start])
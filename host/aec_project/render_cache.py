@@ -0,0 +1,160 @@
+# aec_project/render_cache.py
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Sequence, Tuple, Union
+
+import numpy as np
+
+CacheValue = Union[np.ndarray, Tuple[np.ndarray, ...]]
+
+def _as_loaded(value: CacheValue) -> CacheValue:
+    """Returns `value` in the form `RenderCache.get` loads it: writable, C-contiguous arrays."""
+    if isinstance(value, tuple):
+        return tuple(_as_loaded(item) for item in value)
+    array = np.ascontiguousarray(value)
+    return array if array.flags.writeable else array.copy()
+
+def plugin_identity(plugin_path: str) -> dict:
+    """
+    Describes a plugin file or bundle for cache keys.
+
+    The identity changes whenever the plugin is rebuilt or replaced, since it
+    includes the total size and latest modification time of its files.
+
+    Args:
+        plugin_path (str): The path to the plugin file or bundle directory.
+
+    Returns:
+        dict: The absolute path, total size and latest mtime.
+    """
+    paths = [plugin_path]
+    if os.path.isdir(plugin_path):
+        paths = [os.path.join(directory, name) for directory, _, names in os.walk(plugin_path) for name in names]
+    stats = [os.stat(path) for path in paths]
+    return {
+        'path': os.path.abspath(plugin_path),
+        'size': sum(stat.st_size for stat in stats),
+        'mtime': max((stat.st_mtime_ns for stat in stats), default=0),
+    }
+
+class RenderCache:
+    """
+    A content-addressed on-disk cache for pipeline stage outputs.
+
+    Entries are keyed by a hash of the stage name, its parameters and the
+    keys of the stages it depends on, so a stage is only recomputed when
+    something upstream of it changed. The cache is bounded to `max_bytes`
+    and evicts the least recently used entries first.
+    """
+    VERSION = 1
+
+    def __init__(self, root: str, max_bytes: int = 2 * 2 ** 30):
+        """
+        Initializes the RenderCache.
+
+        Args:
+            root (str): The cache directory; created if missing.
+            max_bytes (int): The maximum total size of the cached files.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def key(cls, stage: str, params: dict, depends_on: Sequence[str] = ()) -> str:
+        """
+        Returns the cache key of a stage output.
+
+        Args:
+            stage (str): The stage name, e.g. 'generate_sine'.
+            params (dict): Everything besides the inputs that affects the output.
+                           Must be JSON-serializable (NumPy scalars are converted).
+            depends_on (Sequence[str]): The keys of the stage inputs.
+
+        Returns:
+            str: The hex digest.
+        """
+        payload = json.dumps(
+            {'version': cls.VERSION, 'stage': stage, 'params': params, 'inputs': list(depends_on)},
+            sort_keys=True, default=lambda value: value.item() if isinstance(value, np.generic) else str(value),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> CacheValue:
+        """
+        Returns a cached value, or None when it is not cached.
+        A hit marks the entry as recently used.
+        """
+        for extension in ('.npy', '.npz'):
+            path = os.path.join(self.root, key + extension)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            if extension == '.npy':
+                return np.load(path)
+            with np.load(path) as archive:
+                return tuple(archive[f'arr_{index}'] for index in range(len(archive.files)))
+        return None
+
+    def put(self, key: str, value: CacheValue):
+        """Stores a single array or a tuple of arrays, then enforces the size bound."""
+        is_tuple = isinstance(value, tuple)
+        fd, staging = tempfile.mkstemp(suffix='.tmp', dir=self.root)
+        with os.fdopen(fd, 'wb') as file:
+            if is_tuple:
+                np.savez(file, *value)
+            else:
+                np.save(file, value)
+        os.replace(staging, os.path.join(self.root, key + ('.npz' if is_tuple else '.npy')))
+        self.evict()
+
+    def cached(self, stage: str, params: dict, compute: Callable[[], CacheValue],
+               depends_on: Sequence[str] = ()) -> Tuple[CacheValue, str]:
+        """
+        Returns the output of a stage, computing and storing it on a miss.
+
+        Args:
+            stage (str): The stage name.
+            params (dict): The stage parameters, see `key`.
+            compute (Callable): Computes the output; only called on a miss.
+            depends_on (Sequence[str]): The keys of the stage inputs.
+
+        Returns:
+            Tuple[CacheValue, str]: The output and its key, to pass on as a
+                                    dependency of downstream stages. The
+                                    output is the same on a hit and a miss:
+                                    writable, C-contiguous arrays.
+        """
+        key = self.key(stage, params, depends_on)
+        value = self.get(key)
+        if value is None:
+            value = _as_loaded(compute())
+            self.put(key, value)
+        return value, key
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits `max_bytes`."""
+        entries = []
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.name.endswith(('.npy', '.npz')):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Deletes every entry."""
+        for name in os.listdir(self.root):
+            if name.endswith(('.npy', '.npz')):
+                os.remove(os.path.join(self.root, name))
@@ -0,0 +1,138 @@
+# aec_project/render_farm.py
+import functools
+import multiprocessing
+import os
+from typing import Callable, Iterable, List, Sequence
+
+import numpy as np
+
+# The processor owned by the current worker process, built once by _init_worker.
+_worker_processor = None
+
+def _init_worker(processor_factory: Callable):
+    """Builds the per-worker processor when a pool process starts."""
+    global _worker_processor
+    _worker_processor = processor_factory()
+
+def _render_array(job):
+    """Processes one in-memory signal with the worker's processor."""
+    audio, sample_rate = job
+    return _worker_processor.process(audio, sample_rate)
+
+def _render_file(job):
+    """Reads one file, processes it with the worker's processor and writes the result."""
+    import soundfile
+    input_path, output_path = job
+    audio, sample_rate = soundfile.read(input_path, dtype='float32', always_2d=True)
+    processed = _worker_processor.process(audio, sample_rate)
+    soundfile.write(output_path, processed, sample_rate)
+    return output_path
+
+def _make_vst_processor(plugin_path: str, params: dict):
+    """Loads a VSTProcessor inside a worker process."""
+    from .audio_processor import VSTProcessor
+    processor = VSTProcessor(plugin_path=plugin_path)
+    if params:
+        processor.set_parameters(params)
+    return processor
+
+def vst_processor_factory(plugin_path: str, params: dict = None) -> Callable:
+    """
+    Returns a picklable factory that loads a VSTProcessor and applies `params`.
+
+    Args:
+        plugin_path (str): The path to the .vst3 plugin.
+        params (dict): Optional plugin parameters, e.g. get_channev_neutral_params().
+
+    Returns:
+        Callable: A zero-argument callable for RenderFarm.
+    """
+    return functools.partial(_make_vst_processor, plugin_path, params)
+
+class RenderFarm:
+    """
+    Renders many signals or files in parallel, one pre-loaded processor per worker.
+
+    Every worker process calls `processor_factory` once when it starts, so an
+    expensive setup such as `load_plugin` is paid once per worker instead of
+    once per file. Any object with a `process(audio, sample_rate)` method can
+    serve as the processor, e.g. a VSTProcessor or a HarmonicProcessor.
+    """
+    AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.ogg')
+
+    def __init__(self, processor_factory: Callable, processes: int = None, mp_context: str = None):
+        """
+        Initializes the RenderFarm and starts its worker processes.
+
+        Args:
+            processor_factory (Callable): A picklable zero-argument callable
+                                          returning the processor, e.g.
+                                          `vst_processor_factory(path)` or
+                                          `functools.partial(HarmonicProcessor, tanh_amount=2.0)`.
+            processes (int): The number of workers. Defaults to the CPU count.
+            mp_context (str): The multiprocessing start method, e.g. 'spawn'.
+        """
+        context = multiprocessing.get_context(mp_context)
+        self.processes = processes or os.cpu_count()
+        self._pool = context.Pool(self.processes, initializer=_init_worker, initargs=(processor_factory,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes."""
+        self._pool.close()
+        self._pool.join()
+
+    def map(self, signals: Iterable[np.ndarray], sample_rate: int) -> List[np.ndarray]:
+        """
+        Processes in-memory signals in parallel.
+
+        Args:
+            signals (Iterable[np.ndarray]): The input signals.
+            sample_rate (int): The sample rate shared by all signals.
+
+        Returns:
+            List[np.ndarray]: The processed signals, in input order.
+        """
+        return list(self._pool.imap(_render_array, ((audio, sample_rate) for audio in signals)))
+
+    def render_files(self, input_paths: Sequence[str], output_dir: str, suffix: str = "_processed") -> List[str]:
+        """
+        Processes audio files in parallel and writes the results as WAV files.
+
+        Args:
+            input_paths (Sequence[str]): The files to render.
+            output_dir (str): The directory for the rendered files.
+            suffix (str): Appended to each input file name.
+
+        Returns:
+            List[str]: The output paths, in input order.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = []
+        for input_path in input_paths:
+            stem = os.path.splitext(os.path.basename(input_path))[0]
+            jobs.append((input_path, os.path.join(output_dir, f"{stem}{suffix}.wav")))
+        return list(self._pool.imap(_render_file, jobs))
+
+    def render_directory(self, input_dir: str, output_dir: str, suffix: str = "_processed") -> List[str]:
+        """
+        Processes every audio file in `input_dir` (e.g. host/songs/).
+
+        Args:
+            input_dir (str): The directory to scan, non-recursively.
+            output_dir (str): The directory for the rendered files.
+            suffix (str): Appended to each input file name.
+
+        Returns:
+            List[str]: The output paths, sorted by input file name.
+        """
+        input_paths = sorted(
+            os.path.join(input_dir, name) for name in os.listdir(input_dir)
+            if name.lower().endswith(self.AUDIO_EXTENSIONS)
+        )
+        return self.render_files(input_paths, output_dir, suffix)
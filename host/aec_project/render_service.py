@@ -0,0 +1,415 @@
+# aec_project/render_service.py
+"""
+A long-lived render service answering JSON jobs over a Unix (or TCP) socket.
+
+Each request is one JSON object per line; each response is one JSON line
+carrying the request's "id". Requests on one connection may be pipelined and
+are answered as they complete. Job fields:
+
+    type         "render", "analyze" or "ping"
+    input        An audio file path, or a generator stage, e.g.
+                 {"type": "sine", "duration": 1.0, "frequency": 500}
+    sample_rate  The sample rate for generated inputs (default 44100)
+    chain        Processing stages applied in order, using the pipeline
+                 stage types, e.g. [{"type": "harmonics", "tanh_bias": -0.5},
+                 {"type": "vst", "plugin_path": "./vst/CHANNEV.vst3"}]
+    output_path  For "render": where to write the result (optional)
+    fundamental  For "analyze": the fundamental in Hz; "num_harmonics" optional
+
+Every file path in a job (the input, "output_path", and the "plugin_path" and
+"path" stage fields) is resolved against the service root and rejected if it
+points outside it. Jobs still run arbitrary processing on the host, so the
+service is meant for trusted local clients only: it listens on a Unix socket
+readable by its owner, or on a loopback TCP address.
+
+Run from the host directory:
+    python -m aec_project.render_service --socket /tmp/aec_render.sock --root .
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import ipaddress
+import json
+import os
+import socket
+import time
+from typing import List, Sequence
+
+import numpy as np
+
+# Stage fields holding file paths, confined to the service root
+PATH_FIELDS = ('plugin_path', 'path')
+
+# Per worker process: the built processing chains, most recently used last.
+_worker_chains = collections.OrderedDict()
+MAX_WORKER_CHAINS = 32
+
+def _chain_key(sample_rate: int, chain: Sequence[dict]) -> str:
+    return json.dumps([sample_rate, list(chain)], sort_keys=True)
+
+def _get_chain(sample_rate: int, chain: Sequence[dict]) -> list:
+    """Returns the stage callables of a chain, built once per worker and kept warm."""
+    from .pipeline import STAGE_TYPES
+    key = _chain_key(sample_rate, chain)
+    if key in _worker_chains:
+        _worker_chains.move_to_end(key)
+        return _worker_chains[key]
+    stages = []
+    for stage in chain:
+        stage = dict(stage)
+        stage_type = stage.pop('type')
+        if stage_type not in STAGE_TYPES:
+            raise ValueError(f"Unknown stage type '{stage_type}'.")
+        stages.append(STAGE_TYPES[stage_type](sample_rate, **stage))
+    _worker_chains[key] = stages
+    if len(_worker_chains) > MAX_WORKER_CHAINS:
+        _worker_chains.popitem(last=False)
+    return stages
+
+def _init_worker(preload: Sequence[dict]):
+    """Imports the processing modules and builds the preloaded chains when a worker starts."""
+    from . import pipeline  # noqa: F401  (pulls in pedalboard, scipy and the processors)
+    for spec in preload:
+        _get_chain(spec.get('sample_rate', 44100), spec.get('chain', []))
+
+def _warm_worker(seconds: float = 0.1) -> int:
+    """Keeps a worker busy briefly, so a wave of these starts every worker."""
+    time.sleep(seconds)
+    return os.getpid()
+
+def _load_input(job: dict):
+    """Returns the job's input signal and sample rate."""
+    source = job['input']
+    if isinstance(source, str):
+        import soundfile
+        return soundfile.read(source, dtype='float32', always_2d=True)
+    sample_rate = job.get('sample_rate', 44100)
+    return _get_chain(sample_rate, [source])[0](), sample_rate
+
+def _confine(path: str, root: str) -> str:
+    """Resolves `path` against `root` and rejects it if it leaves `root`."""
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([resolved, root]) != root:
+        raise PermissionError(f"Path '{path}' is outside the service root.")
+    return resolved
+
+def _confine_stage(stage: dict, root: str) -> dict:
+    return {**stage, **{field: _confine(stage[field], root) for field in PATH_FIELDS if field in stage}}
+
+def confine_job(job: dict, root: str) -> dict:
+    """
+    Returns a copy of `job` with every file path resolved inside `root`.
+
+    Args:
+        job (dict): The job, see the module docstring.
+        root (str): The directory that job paths may not leave.
+
+    Returns:
+        dict: The job with absolute paths.
+
+    Raises:
+        PermissionError: If a path points outside `root`.
+    """
+    root = os.path.realpath(root)
+    job = dict(job)
+    source = job.get('input')
+    if isinstance(source, str):
+        job['input'] = _confine(source, root)
+    elif isinstance(source, dict):
+        job['input'] = _confine_stage(source, root)
+    if job.get('output_path'):
+        job['output_path'] = _confine(job['output_path'], root)
+    job['chain'] = [_confine_stage(stage, root) for stage in job.get('chain', [])]
+    return job
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def _to_json(value):
+    """Converts NumPy results to JSON types; NaN becomes null."""
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim:
+        return [_to_json(item) for item in array]
+    return None if np.isnan(array) else float(array)
+
+def _run_job(job: dict) -> dict:
+    """Runs one render or analyze job in a worker process."""
+    audio, sample_rate = _load_input(job)
+    for stage in _get_chain(sample_rate, job.get('chain', [])):
+        audio = stage(audio)
+
+    if job.get('type', 'render') == 'analyze':
+        from .signal_analyzer import SignalAnalyzer
+        measurement = SignalAnalyzer.measure_harmonics(audio, sample_rate, job['fundamental'],
+                                                       job.get('num_harmonics', 10))
+        return {name: _to_json(value) for name, value in measurement.to_arrays().items()}
+
+    result = {'samples': len(audio), 'sample_rate': sample_rate}
+    if job.get('output_path'):
+        import soundfile
+        soundfile.write(job['output_path'], audio, sample_rate)
+        result['output_path'] = job['output_path']
+    return result
+
+def _run_batch(jobs: List[dict]) -> List[dict]:
+    """Runs a batch of jobs in one worker, isolating failures per job."""
+    responses = []
+    for job in jobs:
+        start = time.perf_counter()
+        try:
+            response = {'ok': True, 'result': _run_job(job)}
+        except Exception as error:
+            response = {'ok': False, 'error': f"{type(error).__name__}: {error}"}
+        response['elapsed_ms'] = (time.perf_counter() - start) * 1e3
+        responses.append(response)
+    return responses
+
+class RenderService:
+    """
+    Batches incoming jobs and runs them on a pool of warm worker processes.
+
+    Workers keep their processing chains (and, through the plugin pool, their
+    loaded plugins) between jobs, so a small job only pays for its own
+    processing. Jobs arriving within `batch_window` seconds of each other are
+    sent to a worker together, up to `max_batch` per batch. At most
+    `max_batches` batches are in flight and at most `max_queue` jobs wait for
+    a batch; beyond that, connections are not read until room frees up.
+
+    File paths in jobs are confined to `root` (see `confine_job`); clients
+    are otherwise trusted, so the service only listens locally.
+    """
+    def __init__(self, processes: int = None, max_batch: int = 16, batch_window: float = 0.002,
+                 max_queue: int = 256, max_batches: int = None, preload: Sequence[dict] = (),
+                 root: str = '.'):
+        """
+        Initializes the RenderService.
+
+        Args:
+            processes (int): The number of worker processes. Defaults to the CPU count.
+            max_batch (int): The maximum number of jobs per batch.
+            batch_window (float): How long a batch waits for more jobs, in seconds.
+            max_queue (int): The maximum number of jobs waiting for a batch.
+            max_batches (int): The maximum number of batches in flight. Defaults
+                               to twice the number of workers.
+            preload (Sequence[dict]): Chains built by every worker at startup,
+                                      as {"sample_rate": ..., "chain": [...]}.
+            root (str): The directory that job inputs, outputs and plugins
+                        must be in. Defaults to the working directory.
+        """
+        self.root = os.path.realpath(root)
+        self.processes = processes or os.cpu_count()
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.processes, initializer=_init_worker,
+                                                               initargs=(list(preload),))
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.max_batches = max_batches or 2 * self.processes
+        self.stats = collections.Counter()
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._servers = []
+
+    async def start(self, path: str = None, host: str = None, port: int = None):
+        """
+        Starts the workers and the batcher, then listens on a Unix socket
+        `path` (owner-only) and/or TCP `host`:`port`, which must be a
+        loopback address.
+        """
+        host = host or '127.0.0.1'
+        if port is not None and not _is_loopback(host):
+            raise ValueError(f"The render service only listens on loopback addresses, got '{host}'.")
+        # Worker processes start on demand; start them all now so the first
+        # jobs do not pay for interpreter startup and imports.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_worker) for _ in range(self.processes)))
+        self._queue = asyncio.Queue(self.max_queue)
+        self._slots = asyncio.Semaphore(self.max_batches)
+        self._batcher = asyncio.create_task(self._run_batcher())
+        if path:
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, path=path))
+            os.chmod(path, 0o600)
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host, port))
+
+    async def serve_forever(self):
+        """Serves until cancelled."""
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def close(self):
+        """Stops listening, cancels the batcher and shuts the workers down."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._batcher:
+            self._batcher.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, job: dict) -> dict:
+        """
+        Queues one job and returns its response; waits while the queue is full.
+
+        Args:
+            job (dict): The job, see the module docstring.
+
+        Returns:
+            dict: {"ok": ..., "result" or "error": ..., "elapsed_ms": ...}.
+        """
+        return await (await self._enqueue(job))
+
+    async def _enqueue(self, job: dict) -> asyncio.Future:
+        """Queues a job, waiting while the queue is full, and returns the future of its response."""
+        future = asyncio.get_running_loop().create_future()
+        if job.get('type') == 'ping':
+            future.set_result({'ok': True, 'result': {'queued': self._queue.qsize(), **self.stats}})
+            return future
+        try:
+            job = confine_job(job, self.root)
+        except (PermissionError, TypeError, AttributeError) as error:
+            future.set_result({'ok': False, 'error': f"{type(error).__name__}: {error}"})
+        else:
+            await self._queue.put((job, future))
+        return future
+
+    async def _run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            self.stats['batches'] += 1
+            self.stats['jobs'] += len(batch)
+            running = loop.run_in_executor(self.executor, _run_batch, [job for job, _ in batch])
+            running.add_done_callback(lambda done, batch=batch: self._finish_batch(done, batch))
+
+    def _finish_batch(self, done: asyncio.Future, batch: list):
+        self._slots.release()
+        if done.cancelled():
+            return
+        error = done.exception()
+        responses = done.result() if error is None else [{'ok': False, 'error': repr(error)}] * len(batch)
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(job_id, response: asyncio.Future):
+            response = await response
+            async with lock:
+                writer.write(json.dumps({'id': job_id, **response}).encode() + b'\n')
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    job = json.loads(line)
+                    job_id = job.get('id')
+                except (ValueError, AttributeError) as error:
+                    job_id, response = None, asyncio.get_running_loop().create_future()
+                    response.set_result({'ok': False, 'error': f"Invalid request: {error}"})
+                else:
+                    # Waits while the queue is full, so the connection is not read further
+                    response = await self._enqueue(job)
+                task = asyncio.create_task(respond(job_id, response))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+class RenderClient:
+    """A small blocking client for RenderService."""
+    def __init__(self, path: str = None, host: str = '127.0.0.1', port: int = None, timeout: float = None):
+        """
+        Connects to a service on a Unix socket `path` or on TCP `host`:`port`.
+        """
+        if path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._socket.settimeout(timeout)
+        self._file = self._socket.makefile('rwb')
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the connection."""
+        self._file.close()
+        self._socket.close()
+
+    def request_many(self, jobs: Sequence[dict]) -> List[dict]:
+        """
+        Sends jobs pipelined on one connection and returns their responses in order.
+        """
+        ids = []
+        for job in jobs:
+            job = {**job, 'id': job.get('id', self._next_id)}
+            self._next_id += 1
+            ids.append(job['id'])
+            self._file.write(json.dumps(job).encode() + b'\n')
+        self._file.flush()
+        responses = {}
+        while len(responses) < len(ids):
+            response = json.loads(self._file.readline())
+            responses[response['id']] = response
+        return [responses[job_id] for job_id in ids]
+
+    def request(self, job: dict) -> dict:
+        """Sends one job and returns its response."""
+        return self.request_many([job])[0]
+
+async def _serve(args):
+    service = RenderService(processes=args.processes, max_batch=args.max_batch,
+                            batch_window=args.batch_window_ms / 1e3, preload=json.loads(args.preload),
+                            root=args.root)
+    await service.start(path=args.socket, host=args.host, port=args.port)
+    print(f"Render service listening on {args.socket or f'{args.host}:{args.port}'}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve render and analysis jobs over a local socket.")
+    parser.add_argument("--socket", help="Unix socket path.")
+    parser.add_argument("--host", default="127.0.0.1", help="A loopback address for --port.")
+    parser.add_argument("--port", type=int, help="TCP port, instead of or in addition to --socket.")
+    parser.add_argument("--processes", type=int, help="Worker processes. Defaults to the CPU count.")
+    parser.add_argument("--root", default=".", help="The directory that job file paths must be in.")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--preload", default="[]",
+                        help='JSON list of chains to warm up, e.g. \'[{"chain": [{"type": "harmonics"}]}]\'.')
+    args = parser.parse_args()
+    if not args.socket and args.port is None:
+        parser.error("Give --socket and/or --port.")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# aec_project/resampling.py
+import numpy as np
+
+class PolyphaseResampler:
+    """
+    A stateful polyphase FIR resampler for block-wise processing.
+
+    Consecutive calls to `process` behave like a single call on the
+    concatenated signal: the filter history is carried between blocks, so
+    there are no discontinuities at block boundaries.
+    """
+    def __init__(self, up: int = 1, down: int = 1, taps_per_phase: int = 16, cutoff: float = 0.9):
+        """
+        Initializes the PolyphaseResampler.
+
+        Args:
+            up (int): The integer upsampling factor.
+            down (int): The integer downsampling factor. Both may be greater
+                        than 1 for a rational ratio, e.g. up=160, down=147
+                        for 44.1 kHz to 48 kHz.
+            taps_per_phase (int): Filter length per polyphase branch, must be
+                                  even. Longer filters give a steeper
+                                  anti-aliasing slope.
+            cutoff (float): Passband edge relative to the lower of the two
+                            Nyquist frequencies.
+        """
+        from scipy.signal import firwin
+        if up < 1 or down < 1:
+            raise ValueError("Resampling factors must be positive integers.")
+        if taps_per_phase % 2:
+            raise ValueError("taps_per_phase must be even.")
+        common = np.gcd(up, down)
+        self.up = up = up // common
+        self.down = down = down // common
+        factor = max(up, down)
+        # The filter is centered on a multiple of `down`, so its group delay is
+        # a whole number of output samples; for integer factors this is the
+        # odd length taps_per_phase * factor + 1.
+        center = -(-taps_per_phase * factor // (2 * down)) * down
+        num_taps = 2 * center + 1
+        self.filter = firwin(num_taps, cutoff / factor, window=('kaiser', 8.0)) * up
+        # The group delay in samples of the lower rate (rounded down for
+        # rational ratios) and in output samples
+        self.latency = center // factor if factor > 1 else 0
+        self.output_latency = center // down if factor > 1 else 0
+        # A multiple of `down` long enough to cover the filter at the input rate
+        self._history_len = -(-(-(-(num_taps - 1) // up)) // down) * down
+        self._history = None
+
+    def reset(self):
+        """Clears the filter history."""
+        self._history = None
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resamples one block of shape (samples,) or (samples, channels).
+
+        Args:
+            block (np.ndarray): The input block. Its length must be a multiple
+                                of `down`.
+
+        Returns:
+            np.ndarray: The resampled block with `len(block) * up // down` samples.
+        """
+        if self.up == 1 and self.down == 1:
+            return block
+        from scipy.signal import upfirdn
+        if len(block) % self.down:
+            raise ValueError(f"Block length must be a multiple of {self.down}.")
+        if self._history is None:
+            self._history = np.zeros((self._history_len,) + block.shape[1:], dtype=block.dtype)
+        extended = np.concatenate([self._history, block], axis=0)
+        self._history = extended[len(extended) - self._history_len:]
+
+        start = self._history_len * self.up // self.down
+        stop = start + len(block) * self.up // self.down
+        resampled = upfirdn(self.filter, extended, up=self.up, down=self.down, axis=0)
+        return resampled[start:stop].astype(block.dtype, copy=False)
+
+class Oversampler:
+    """Runs a block-wise callable at a multiple of the base sample rate."""
+    FACTORS = (1, 2, 4, 8)
+
+    def __init__(self, factor: int, taps_per_phase: int = 16):
+        """
+        Initializes the Oversampler.
+
+        Args:
+            factor (int): The oversampling factor, one of 1, 2, 4 or 8.
+            taps_per_phase (int): Filter length per polyphase branch.
+        """
+        if factor not in self.FACTORS:
+            raise ValueError(f"Oversampling factor must be one of {self.FACTORS}, got {factor}.")
+        self.factor = factor
+        self.upsampler = PolyphaseResampler(up=factor, taps_per_phase=taps_per_phase)
+        self.downsampler = PolyphaseResampler(down=factor, taps_per_phase=taps_per_phase)
+
+    @property
+    def latency(self) -> int:
+        """The total delay of the up- and downsampling filters in base-rate samples."""
+        return self.upsampler.latency + self.downsampler.latency
+
+    def reset(self):
+        """Clears the state of both resampling filters."""
+        self.upsampler.reset()
+        self.downsampler.reset()
+
+    def process(self, block: np.ndarray, func) -> np.ndarray:
+        """
+        Upsamples `block`, applies `func` to it and downsamples the result.
+
+        Args:
+            block (np.ndarray): The input block at the base rate.
+            func (callable): Processing applied to the oversampled block.
+
+        Returns:
+            np.ndarray: The processed block at the base rate, delayed by `latency`.
+        """
+        if self.factor == 1:
+            return func(block)
+        return self.downsampler.process(func(self.upsampler.process(block)))
@@ -0,0 +1,191 @@
+# aec_project/results_catalog.py
+import json
+import numbers
+import os
+import sqlite3
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .data_handler import ObjectStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    signal TEXT,
+    frequency REAL,
+    plugin TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS arrays (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_signal_frequency ON runs(signal, frequency);
+CREATE INDEX IF NOT EXISTS runs_plugin ON runs(plugin);
+CREATE INDEX IF NOT EXISTS params_name_value ON params(name, value);
+CREATE INDEX IF NOT EXISTS params_name_text ON params(name, text);
+CREATE INDEX IF NOT EXISTS arrays_run ON arrays(run_id);
+"""
+
+_OPERATORS = ('<', '<=', '>', '>=', '=', '!=')
+
+class RunArrays(Mapping):
+    """A lazy mapping of the arrays recorded for one run."""
+    def __init__(self, objects: ObjectStore, digests: Dict[str, str]):
+        self._objects = objects
+        self.digests = digests
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._objects.get(self.digests[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.digests)
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+class ResultsCatalog:
+    """
+    An append-only catalog of analysis runs.
+
+    Each run is one row in a local SQLite index, with its signal, frequency,
+    plugin and processor parameters as indexed columns. The arrays of a run
+    live in a content-addressed ObjectStore next to the index, so queries
+    never touch array files and identical arrays are stored once.
+
+    Layout:
+        <root>/catalog.sqlite
+        <root>/objects/<digest[:2]>/<digest>.npy
+    """
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.objects = ObjectStore(os.path.join(root, 'objects'))
+        self._connection = sqlite3.connect(os.path.join(root, 'catalog.sqlite'), timeout=30)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Closes the index."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_run(self, signal: str = None, frequency: float = None, plugin: str = None,
+                params: dict = None, arrays: Dict[str, np.ndarray] = None) -> int:
+        """
+        Records one run.
+
+        Args:
+            signal (str): The test signal, e.g. 'sine'.
+            frequency (float): The test frequency in Hz.
+            plugin (str): The plugin identity, e.g. its path.
+            params (dict): Processor parameters. Numbers (and bools) are
+                           indexed numerically, anything else as text.
+            arrays (Dict[str, np.ndarray]): Arrays to store with the run.
+
+        Returns:
+            int: The id of the new run.
+        """
+        digests = {name: self.objects.put(array) for name, array in (arrays or {}).items()}
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (created, signal, frequency, plugin) VALUES (?, ?, ?, ?)",
+                (time.time(), signal, frequency, plugin),
+            )
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO params (run_id, name, value, text) VALUES (?, ?, ?, ?)",
+                [(run_id, name, *self._encode(value)) for name, value in (params or {}).items()],
+            )
+            self._connection.executemany(
+                "INSERT INTO arrays (run_id, name, digest) VALUES (?, ?, ?)",
+                [(run_id, name, digest) for name, digest in digests.items()],
+            )
+        return run_id
+
+    def query(self, signal: str = None, frequency: float = None, plugin: str = None,
+              **conditions) -> List[int]:
+        """
+        Returns the ids of the runs matching every given condition.
+
+        Parameter conditions are given as keyword arguments, either as a value
+        (equality) or as an (operator, value) pair, e.g.
+        `catalog.query(frequency=500, tanh_bias=('<', 0))`.
+
+        Args:
+            signal (str): Only runs with this signal.
+            frequency (float): Only runs at this frequency.
+            plugin (str): Only runs with this plugin.
+            **conditions: Conditions on processor parameters.
+
+        Returns:
+            List[int]: The matching run ids in insertion order.
+        """
+        clauses, arguments = [], []
+        for column, value in (('signal', signal), ('frequency', frequency), ('plugin', plugin)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                arguments.append(value)
+        for name, condition in conditions.items():
+            operator, value = condition if isinstance(condition, tuple) else ('=', condition)
+            if operator not in _OPERATORS:
+                raise ValueError(f"Unsupported operator '{operator}', expected one of {_OPERATORS}.")
+            number, text = self._encode(value)
+            column = 'value' if text is None else 'text'
+            clauses.append(f"id IN (SELECT run_id FROM params WHERE name = ? AND {column} {operator} ?)")
+            arguments.extend([name, number if text is None else text])
+        sql = "SELECT id FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [row[0] for row in self._connection.execute(sql + " ORDER BY id", arguments)]
+
+    def get_run(self, run_id: int) -> dict:
+        """
+        Returns one run as a dict with its metadata, 'params' and lazy 'arrays'.
+
+        Args:
+            run_id (int): The run id.
+
+        Returns:
+            dict: The run record.
+        """
+        row = self._connection.execute(
+            "SELECT id, created, signal, frequency, plugin FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No run with id {run_id}")
+        params = {
+            name: value if text is None else json.loads(text)
+            for name, value, text in self._connection.execute(
+                "SELECT name, value, text FROM params WHERE run_id = ?", (run_id,)
+            )
+        }
+        digests = dict(self._connection.execute("SELECT name, digest FROM arrays WHERE run_id = ?", (run_id,)))
+        record = dict(zip(('id', 'created', 'signal', 'frequency', 'plugin'), row))
+        record['params'] = params
+        record['arrays'] = RunArrays(self.objects, digests)
+        return record
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    @staticmethod
+    def _encode(value) -> Tuple[float, str]:
+        """Splits a parameter value into its (numeric, text) index columns."""
+        if isinstance(value, (numbers.Real, np.bool_)):
+            return float(value), None
+        return None, json.dumps(value)
@@ -1,10 +1,70 @@
 # aec_project/signal_analyzer.py
+import functools
 import numpy as np
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple, Union
+
+from .audio_generator import sweep_rate
+from .loudness import LoudnessMeasurement, LoudnessMeter
+
+def _fft():
+    """Imports scipy.fft on first use; it takes longer to import than the rest of the package."""
+    import scipy.fft
+    return scipy.fft
+
+@functools.lru_cache(maxsize=64)
+def frequency_axis(length: int, sample_rate: float) -> np.ndarray:
+    """
+    Returns the cached rfft frequency bins for a signal length and sample rate.
+    The array is shared between callers and therefore read-only.
+    """
+    frequencies = np.fft.rfftfreq(length, 1 / sample_rate)
+    frequencies.flags.writeable = False
+    return frequencies
+
+@functools.lru_cache(maxsize=64)
+def analysis_window(name: str, length: int) -> np.ndarray:
+    """
+    Returns a cached, read-only periodic window, e.g. 'hann' or 'blackmanharris'.
+    """
+    from scipy.signal import get_window
+    window = get_window(name, length, fftbins=True)
+    window.flags.writeable = False
+    return window
+
+@dataclass
+class HarmonicMeasurement:
+    """
+    A compact record of harmonic distortion measurements.
+
+    Attributes:
+        fundamental (float): The fundamental frequency in Hz.
+        levels (np.ndarray): Peak amplitude of harmonics 1..K, shape (K, channels).
+                             Harmonics above Nyquist are NaN.
+        thd (np.ndarray): Total harmonic distortion per channel, as a ratio.
+        thd_n (np.ndarray): THD plus noise per channel, as a ratio.
+    """
+    fundamental: float
+    levels: np.ndarray
+    thd: np.ndarray
+    thd_n: np.ndarray
+
+    def levels_db(self) -> np.ndarray:
+        """Returns the harmonic levels in dB relative to the fundamental."""
+        return 20 * np.log10(self.levels / self.levels[:1])
+
+    def to_arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        """Returns the record as named arrays, e.g. for DataHandler.save_analysis_data."""
+        return {
+            f"{prefix}fundamental": np.asarray(self.fundamental),
+            f"{prefix}harmonic_levels": self.levels,
+            f"{prefix}thd": self.thd,
+            f"{prefix}thd_n": self.thd_n,
+        }
 
 class SignalAnalyzer:
     """Provides methods for signal analysis."""
-    
+
     @staticmethod
     def compute_fft(signal: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -21,8 +81,334 @@ class SignalAnalyzer:
         if signal.ndim > 1:
             # If stereo, use the first channel for FFT analysis
             signal = signal[:, 0]
-            
+
         fft_values = np.fft.rfft(signal)
-        frequencies = np.fft.rfftfreq(len(signal), 1 / sample_rate)
+        frequencies = frequency_axis(len(signal), sample_rate)
         magnitudes = np.abs(fft_values)
-        return frequencies, magnitudes
\ No newline at end of file
+        return frequencies, magnitudes
+
+    @staticmethod
+    def compute_spectra(signals: Union[np.ndarray, Sequence[np.ndarray]], sample_rate: int,
+                        window: str = None, workers: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the magnitude spectra of many same-length signals at once.
+
+        All channels of all signals are transformed in a single vectorized FFT
+        call, and the frequency axis is shared through a cache.
+
+        Args:
+            signals (np.ndarray | Sequence[np.ndarray]): Signals of shape
+                (samples,) or (samples, channels), or one array of shape
+                (signals, samples[, channels]).
+            sample_rate (int): The sample rate shared by all signals.
+            window (str): Optional window name applied before the FFT.
+            workers (int): Threads used by scipy.fft; -1 uses all cores.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The frequency bins and the magnitudes
+                                           with shape (signals, bins[, channels]).
+        """
+        stacked = signals if isinstance(signals, np.ndarray) else np.stack(signals)
+        length = stacked.shape[1]
+        if window is not None:
+            shape = (1, length) + (1,) * (stacked.ndim - 2)
+            stacked = stacked * analysis_window(window, length).reshape(shape)
+        magnitudes = np.abs(_fft().rfft(stacked, axis=1, workers=workers))
+        return frequency_axis(length, sample_rate), magnitudes
+
+    @staticmethod
+    def decimate_spectrum(frequencies: np.ndarray, magnitudes: np.ndarray, num_bands: int = 2048,
+                          f_min: float = 10.0, axis: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduces magnitude spectra to log-spaced bands for storage and plotting.
+
+        Each band keeps its highest magnitude, so harmonic lines keep their
+        level on a log-frequency plot while the stored size no longer grows
+        with the signal length. Bands narrower than a bin collapse into it.
+
+        Args:
+            frequencies (np.ndarray): The frequency bins, e.g. from `compute_spectra`.
+            magnitudes (np.ndarray): The magnitudes, with the bins along `axis`.
+            num_bands (int): The number of bands between `f_min` and Nyquist.
+            f_min (float): The lowest frequency kept in Hz.
+            axis (int): The bin axis of `magnitudes`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The band frequencies (the mean of
+                                           each band's first and last bins)
+                                           and the peak magnitudes per band.
+        """
+        edges = np.geomspace(f_min, frequencies[-1], num_bands + 1)
+        starts = np.unique(np.searchsorted(frequencies, edges[:-1]))
+        stops = np.append(starts[1:], len(frequencies))
+        band_frequencies = (frequencies[starts] + frequencies[stops - 1]) / 2
+        return band_frequencies, np.maximum.reduceat(magnitudes, starts, axis=axis)
+
+    @staticmethod
+    def stft(signal: np.ndarray, sample_rate: int, n_fft: int = 2048, hop: int = 512,
+             window: str = 'hann', workers: int = -1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes the short-time Fourier transform magnitudes of all channels.
+
+        Frames are taken as strided views of the input, so framing does not
+        copy the signal.
+
+        Args:
+            signal (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal.
+            n_fft (int): The frame length in samples.
+            hop (int): The hop between frames in samples.
+            window (str): The window name.
+            workers (int): Threads used by scipy.fft; -1 uses all cores.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The frequency bins, the
+                frame start times in seconds and the magnitudes with shape
+                (frames, bins[, channels]).
+        """
+        frames = SignalAnalyzer._frames(signal, n_fft, hop)
+        shape = (1, n_fft) + (1,) * (signal.ndim - 1)
+        windowed = frames * analysis_window(window, n_fft).reshape(shape)
+        magnitudes = np.abs(_fft().rfft(windowed, axis=1, workers=workers))
+        times = np.arange(len(frames)) * hop / sample_rate
+        return frequency_axis(n_fft, sample_rate), times, magnitudes
+
+    @staticmethod
+    def welch(signal: np.ndarray, sample_rate: int, n_fft: int = 2048, hop: int = 1024,
+              window: str = 'hann', max_frames: int = 256, workers: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimates the power spectral density of all channels with Welch's method.
+
+        Frames are transformed `max_frames` at a time and accumulated, so
+        memory use does not grow with the signal length.
+
+        Args:
+            signal (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal.
+            n_fft (int): The segment length in samples.
+            hop (int): The hop between segments in samples.
+            window (str): The window name.
+            max_frames (int): The number of segments transformed per FFT call.
+            workers (int): Threads used by scipy.fft; -1 uses all cores.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The frequency bins and the one-sided
+                                           PSD with shape (bins[, channels]).
+        """
+        frames = SignalAnalyzer._frames(signal, n_fft, hop)
+        win = analysis_window(window, n_fft)
+        shape = (1, n_fft) + (1,) * (signal.ndim - 1)
+        power = np.zeros((n_fft // 2 + 1,) + signal.shape[1:])
+        for start in range(0, len(frames), max_frames):
+            chunk = frames[start:start + max_frames]
+            detrended = chunk - chunk.mean(axis=1, keepdims=True)
+            spectrum = _fft().rfft(detrended * win.reshape(shape), axis=1, workers=workers)
+            power += np.sum(spectrum.real ** 2 + spectrum.imag ** 2, axis=0)
+        power /= len(frames) * sample_rate * np.sum(win ** 2)
+        # One-sided spectrum: double every bin except DC and (for even n_fft) Nyquist
+        power[1:(n_fft + 1) // 2] *= 2
+        return frequency_axis(n_fft, sample_rate), power
+
+    @staticmethod
+    def measure_harmonics(signal: np.ndarray, sample_rate: int, fundamental: float, num_harmonics: int = 10,
+                          window: str = 'blackmanharris', block_size: int = 65536) -> HarmonicMeasurement:
+        """
+        Measures THD, THD+N and the level of each harmonic of `fundamental`.
+
+        Only the frequencies k * fundamental are evaluated, with a windowed
+        single-frequency DFT (the quantity the Goertzel algorithm computes)
+        accumulated over blocks of the signal. No full spectrum is built, so
+        the cost is O(samples * harmonics) and the result is a few numbers
+        per channel.
+
+        Args:
+            signal (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal.
+            fundamental (float): The fundamental frequency in Hz.
+            num_harmonics (int): The number of harmonics to measure, including
+                                 the fundamental.
+            window (str): The window applied before the DFT. A low-sidelobe
+                          window keeps neighbouring harmonics from leaking.
+            block_size (int): The number of samples evaluated per step.
+
+        Returns:
+            HarmonicMeasurement: The measurement record.
+        """
+        samples = signal.reshape(len(signal), -1)
+        harmonics = fundamental * np.arange(1, num_harmonics + 1)
+        cycles_per_sample = harmonics / sample_rate
+        win = analysis_window(window, len(samples))
+
+        spectrum = np.zeros((num_harmonics, samples.shape[1]), dtype=np.complex128)
+        for start in range(0, len(samples), block_size):
+            n = np.arange(start, min(start + block_size, len(samples)))
+            # Reduce the phase to one turn in float64 before the exponential
+            phase = np.mod(np.multiply.outer(cycles_per_sample, n), 1.0)
+            spectrum += np.exp(-2j * np.pi * phase) @ (samples[n] * win[n, np.newaxis])
+
+        levels = 2 * np.abs(spectrum) / np.sum(win)
+        levels[harmonics >= sample_rate / 2] = np.nan
+        fundamental_level = levels[0]
+        thd = np.sqrt(np.nansum(levels[1:] ** 2, axis=0)) / fundamental_level
+
+        # THD+N: everything except DC and the fundamental, relative to the fundamental (RMS)
+        total_power = np.var(samples, axis=0)
+        residual_power = np.maximum(total_power - fundamental_level ** 2 / 2, 0.0)
+        thd_n = np.sqrt(residual_power) / (fundamental_level / np.sqrt(2))
+
+        if signal.ndim == 1:
+            levels, thd, thd_n = levels[:, 0], thd[0], thd_n[0]
+        return HarmonicMeasurement(fundamental=fundamental, levels=levels, thd=thd, thd_n=thd_n)
+
+    @staticmethod
+    def measure_loudness(signal: np.ndarray, sample_rate: int, block_size: int = 65536) -> LoudnessMeasurement:
+        """
+        Measures the BS.1770 loudness, true peak and crest factor of a signal.
+
+        The signal is fed to a `LoudnessMeter` in blocks, the same way a
+        stream of blocks from a file would be; see `loudness.measure_files`
+        for files and albums.
+
+        Args:
+            signal (np.ndarray): The input signal, (samples,) or (samples, channels).
+            sample_rate (int): The sample rate of the signal.
+            block_size (int): The number of samples measured per step.
+
+        Returns:
+            LoudnessMeasurement: The measurement record.
+        """
+        samples = signal.reshape(len(signal), -1)
+        meter = LoudnessMeter(sample_rate, samples.shape[1])
+        for start in range(0, len(samples), block_size):
+            meter.process(samples[start:start + block_size])
+        return meter.result()
+
+    @staticmethod
+    def deconvolve_sweep(response: np.ndarray, sweep: np.ndarray, sample_rate: int, f_start: float,
+                         f_end: float, regularization: float = 1e-4) -> np.ndarray:
+        """
+        Recovers the impulse response of a system from its response to a sweep.
+
+        The response spectrum is divided by the sweep spectrum, regularized
+        outside the swept band. For an exponential sweep, the linear impulse
+        response starts at index 0 and the harmonic responses appear before
+        it, i.e. wrapped around to the end of the returned array (see
+        `extract_harmonic_irs`).
+
+        Args:
+            response (np.ndarray): The recorded output, (samples,) or
+                                   (samples, channels). It should be long
+                                   enough to include the system's tail.
+            sweep (np.ndarray): The excitation sweep, (samples,) or (samples, 1+).
+                                Only its first channel is used.
+            sample_rate (int): The sample rate of both signals.
+            f_start (float): The sweep start frequency in Hz.
+            f_end (float): The sweep end frequency in Hz.
+            regularization (float): The inverse-filter floor, relative to the
+                                    sweep's peak power, applied outside the band.
+
+        Returns:
+            np.ndarray: The circular impulse response, shape (n_fft[, channels]).
+        """
+        if sweep.ndim > 1:
+            sweep = sweep[:, 0]
+        fft = _fft()
+        n_fft = fft.next_fast_len(len(response) + len(sweep), real=True)
+        sweep_spectrum = fft.rfft(sweep, n_fft)
+        response_spectrum = fft.rfft(response, n_fft, axis=0)
+
+        power = np.abs(sweep_spectrum) ** 2
+        frequencies = frequency_axis(n_fft, sample_rate)
+        floor = np.where((frequencies >= f_start) & (frequencies <= f_end), 1e-12, regularization) * power.max()
+        inverse = np.conj(sweep_spectrum) / (power + floor)
+        if response.ndim > 1:
+            inverse = inverse[:, np.newaxis]
+        return fft.irfft(response_spectrum * inverse, n_fft, axis=0)
+
+    @staticmethod
+    def extract_harmonic_irs(impulse_response: np.ndarray, sample_rate: int, duration: float, f_start: float,
+                             f_end: float, orders: int = 5, ir_length: int = None,
+                             lead: int = 64) -> Dict[int, np.ndarray]:
+        """
+        Splits a deconvolved synchronized-sweep response into per-order harmonic IRs.
+
+        The k-th order response sits L * ln(k) seconds before the linear one
+        (L from `sweep_rate`). It is shifted back to time zero in the frequency
+        domain, including the fractional part of the delay, and windowed.
+
+        Args:
+            impulse_response (np.ndarray): The output of `deconvolve_sweep`.
+            sample_rate (int): The sample rate.
+            duration (float): The duration passed to the SignalGenerator that
+                              produced the sweep.
+            f_start (float): The sweep start frequency in Hz.
+            f_end (float): The sweep end frequency in Hz.
+            orders (int): The number of orders to extract, including the linear one.
+            ir_length (int): The samples kept per order. Defaults to the gap
+                             between the two highest orders, so they do not overlap.
+            lead (int): The samples kept before each response's time zero,
+                        to include the band-limiting pre-ringing.
+
+        Returns:
+            Dict[int, np.ndarray]: Order (1 = linear) to impulse response of
+                                   shape (ir_length[, channels]), starting
+                                   `lead` samples before time zero.
+        """
+        rate = sweep_rate(duration, f_start, f_end, synchronized=True)
+        n_fft = len(impulse_response)
+        delays = rate * np.log(np.arange(1, orders + 1)) * sample_rate
+        if ir_length is None:
+            ir_length = int(delays[-1] - delays[-2]) if orders > 1 else n_fft // 2
+        fft = _fft()
+        spectrum = fft.rfft(impulse_response, axis=0)
+        frequencies = frequency_axis(n_fft, sample_rate)
+
+        irs = {}
+        for order, delay in enumerate(delays, start=1):
+            # Delay by the order's offset plus the lead, then keep the first ir_length samples
+            shift = np.exp(-2j * np.pi * frequencies * (delay + lead) / sample_rate)
+            if impulse_response.ndim > 1:
+                shift = shift[:, np.newaxis]
+            irs[order] = fft.irfft(spectrum * shift, n_fft, axis=0)[:ir_length]
+        return irs
+
+    @staticmethod
+    def harmonic_responses(irs: Dict[int, np.ndarray], sample_rate: int) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
+        """
+        Returns the magnitude response of each harmonic IR on the input frequency axis.
+
+        The spectrum of the order-k IR at frequency k * f holds the k-th
+        harmonic of an input sine at f, so each order is read at k times the
+        returned frequencies (interpolated between bins). The value at f is
+        then the amplitude of the k-th harmonic produced by a sine of
+        frequency f, relative to the sweep amplitude; order 1 is the linear
+        gain. Where k * f is above Nyquist the value is NaN.
+
+        Args:
+            irs (Dict[int, np.ndarray]): The output of `extract_harmonic_irs`.
+            sample_rate (int): The sample rate.
+
+        Returns:
+            Tuple[np.ndarray, Dict[int, np.ndarray]]: The input frequency bins
+                and the magnitudes per order, shape (bins[, channels]).
+        """
+        length = len(next(iter(irs.values())))
+        rfft = _fft().rfft
+        frequencies = frequency_axis(length, sample_rate)
+        responses = {}
+        for order, ir in irs.items():
+            magnitudes = np.abs(rfft(ir, axis=0)).reshape(len(frequencies), -1)
+            harmonic = order * frequencies
+            resampled = np.stack([np.interp(harmonic, frequencies, column, right=np.nan)
+                                  for column in magnitudes.T], axis=-1)
+            responses[order] = resampled.reshape((len(frequencies),) + ir.shape[1:])
+        return frequencies, responses
+
+    @staticmethod
+    def _frames(signal: np.ndarray, n_fft: int, hop: int) -> np.ndarray:
+        """Returns a (frames, n_fft[, channels]) strided view of `signal`."""
+        if len(signal) < n_fft:
+            raise ValueError(f"Signal is shorter than one frame ({len(signal)} < {n_fft}).")
+        frames = np.lib.stride_tricks.sliding_window_view(signal, n_fft, axis=0)[::hop]
+        # sliding_window_view appends the window axis last; move it after the frame axis
+        return np.moveaxis(frames, -1, 1)
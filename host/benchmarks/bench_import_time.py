@@ -0,0 +1,77 @@
+# benchmarks/bench_import_time.py
+"""
+Import time of the host entry points, each measured in a fresh interpreter.
+
+Also reports which heavy dependencies an import pulls in; they should only
+load when a code path that needs them runs. With --max-ms the script exits
+with status 1 when a module is slower than the budget or loads a heavy
+dependency, so it can gate CI.
+
+Run from the host directory:
+    python -m benchmarks.bench_import_time --max-ms 150
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = [
+    'aec_project',
+    'aec_project.audio_processor',
+    'aec_project.signal_analyzer',
+    'aec_project.audio_io',
+    'aec_project.loudness',
+    'aec_project.pipeline',
+    'aec_project.automation',
+    'aec_project.realtime',
+    'aec_project.render_service',
+    'aec_project.cli',
+    'process_audio',
+    'plot_results',
+]
+
+# Dependencies that must not load at import time
+HEAVY = ['pedalboard', 'matplotlib', 'scipy.signal', 'soundfile', 'Saturations.Saturations']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1e3, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def measure(module: str, repeat: int) -> dict:
+    """Returns the fastest import time of `module` over `repeat` fresh interpreters."""
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                                   capture_output=True, text=True, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result['ms'] < best['ms']:
+            best = result
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the host modules.")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Fail when an import takes longer.")
+    parser.add_argument("--allow-heavy", action="store_true", help="Do not fail on heavy dependencies.")
+    args = parser.parse_args()
+
+    baseline = measure('numpy', args.repeat)['ms']
+    print(f"numpy alone: {baseline:.1f} ms")
+    print(f"{'module':<32}{'import (ms)':>12}  heavy dependencies")
+    failed = False
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        print(f"{module:<32}{result['ms']:>12.1f}  {', '.join(result['heavy']) or '-'}")
+        if args.max_ms is not None and result['ms'] > args.max_ms:
+            failed = True
+        if result['heavy'] and not args.allow_heavy:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
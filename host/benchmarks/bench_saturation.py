@@ -0,0 +1,67 @@
+# benchmarks/bench_saturation.py
+"""
+Compares the fused `saturation_chain` against the per-function path.
+
+Run from the host directory:
+    python -m benchmarks.bench_saturation
+"""
+import argparse
+import timeit
+import tracemalloc
+import numpy as np
+from Saturations.Saturations import (
+    add_tanh_harmonics, add_cubic_harmonics, add_fullrect_harmonics, add_asym_clip, saturation_chain
+)
+
+PARAMS = dict(asym=0.07, tanh=1.0, tanh_bias=-0.5, cubic=1.0, fullrect=0.1)
+
+def per_function_chain(audio: np.ndarray) -> np.ndarray:
+    """The original HarmonicProcessor.process implementation."""
+    processed_channels = []
+    for i in range(audio.shape[1]):
+        channel = audio[:, i]
+        channel = add_asym_clip(channel, amount=PARAMS['asym'])
+        channel = add_tanh_harmonics(channel, amount=PARAMS['tanh'], bias=PARAMS['tanh_bias'])
+        channel = add_cubic_harmonics(channel, amount=PARAMS['cubic'])
+        channel = add_fullrect_harmonics(channel, amount=PARAMS['fullrect'])
+        processed_channels.append(channel)
+    return np.stack(processed_channels, axis=-1)
+
+def peak_allocation(func) -> int:
+    """Returns the peak number of bytes allocated while running `func`."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fused saturation chain.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Signal length in seconds.")
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sample_rate = 44100
+    rng = np.random.default_rng(0)
+    audio = (0.5 * rng.standard_normal((int(args.seconds * sample_rate), args.channels))).astype(np.float32)
+    out = np.empty_like(audio)
+    scratch = np.empty_like(audio)
+
+    reference = per_function_chain(audio)
+    fused = saturation_chain(audio, out=out, scratch=scratch, **PARAMS)
+    print(f"max abs difference: {np.max(np.abs(reference - fused)):.3e}")
+
+    cases = {
+        "per-function": lambda: per_function_chain(audio),
+        "fused": lambda: saturation_chain(audio, **PARAMS),
+        "fused, out= + scratch": lambda: saturation_chain(audio, out=out, scratch=scratch, **PARAMS),
+    }
+    signal_bytes = audio.nbytes
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        peak = peak_allocation(func)
+        print(f"{name:>24}: {seconds * 1e3:8.2f} ms  peak alloc {peak / signal_bytes:5.2f}x signal")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_tanh_table.py
+"""
+Accuracy and throughput of the lookup-table saturation against the exact path.
+
+Run from the host directory:
+    python -m benchmarks.bench_tanh_table
+"""
+import argparse
+import timeit
+import numpy as np
+from Saturations.Saturations import add_tanh_harmonics, curve_table, saturation_chain
+
+SETTINGS = [(1.0, 0.0), (1.0, -0.5), (4.0, 0.2), (10.0, 0.5)]
+
+def best_of(func, repeat: int) -> float:
+    """Returns the fastest of `repeat` single runs of `func`, in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tanh lookup table.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Signal length in seconds.")
+    parser.add_argument("--max-error", type=float, default=1e-4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sample_rate = 44100
+    rng = np.random.default_rng(0)
+    audio = np.clip(0.5 * rng.standard_normal((int(args.seconds * sample_rate), 2)), -1, 1).astype(np.float32)
+    out = np.empty_like(audio)
+    scratch = np.empty_like(audio)
+
+    print(f"{'amount':>6} {'bias':>5} {'points':>7} {'max err':>9} {'build ms':>9} {'exact ms':>9} {'table ms':>9}")
+    for amount, bias in SETTINGS:
+        curve_table.cache_clear()
+        build = best_of(lambda: curve_table('tanh', amount, bias, args.max_error), 1)
+        table = curve_table('tanh', amount, bias, args.max_error)
+        exact = add_tanh_harmonics(audio, amount, bias, remove_dc=False)
+        error = np.max(np.abs(table(audio) - exact))
+        exact_ms = best_of(lambda: add_tanh_harmonics(audio, amount, bias, remove_dc=False), args.repeat)
+        table_ms = best_of(lambda: add_tanh_harmonics(audio, amount, bias, remove_dc=False, fast=True,
+                                                      max_error=args.max_error), args.repeat)
+        print(f"{amount:6.1f} {bias:5.1f} {table.num_points:7d} {error:9.2e} {build:9.2f} {exact_ms:9.2f} {table_ms:9.2f}")
+
+    params = dict(asym=0.07, tanh=4.0, tanh_bias=0.2, cubic=1.0, fullrect=0.1)
+    exact = saturation_chain(audio, **params)
+    fast = saturation_chain(audio, fast=True, max_error=args.max_error, **params)
+    print(f"\nsaturation_chain max err {np.max(np.abs(fast - exact)):.2e}")
+    for name, fast_math in (("exact", False), ("table", True)):
+        ms = best_of(lambda: saturation_chain(audio, out=out, scratch=scratch, fast=fast_math,
+                                              max_error=args.max_error, **params), args.repeat)
+        print(f"saturation_chain {name:>5}: {ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,7 @@
 # plot_results.py
-import matplotlib.pyplot as plt
-import numpy as np
 import argparse
 from aec_project.data_handler import DataHandler
-
-def plot_fft_comparison(data: dict):
-    """
-    Plots the FFT data from the loaded dictionary.
-
-    Args:
-        data (dict): A dictionary containing FFT data arrays.
-    """
-    plt.figure(figsize=(12, 6))
-    
-    # Convert magnitudes to dB, adding a small epsilon to avoid log(0)
-    epsilon = 1e-9
-    
-    plt.semilogx(data['freq_axis'], 20 * np.log10(data['effected_harm_fft'] + epsilon), label='Harmonics Added', linestyle='--')
-    plt.semilogx(data['freq_axis'], 20 * np.log10(data['effected_vst_fft'] + epsilon), label='VST Processed')
-    plt.semilogx(data['freq_axis'], 20 * np.log10(data['original_fft'] + epsilon), label='Original')
-    
-    plt.title('FFT Comparison of Audio Signals')
-    plt.xlabel('Frequency (Hz)')
-    plt.ylabel('Magnitude (dB)')
-    plt.legend()
-    plt.grid(True)
-    plt.ylim(bottom=-60) # Set a floor for better visualization
-    plt.show()
+from aec_project.plotting import plot_fft_comparison
 
 def main():
     """Main function to load data and plot."""
@@ -34,7 +9,7 @@ def main():
     parser.add_argument(
         "input_file",
         type=str,
-        help="Path to the .npz file containing the analysis data."
+        help="Path to the .npz file or analysis store directory containing the analysis data."
     )
     args = parser.parse_args()
 
@@ -51,4 +26,4 @@ def main():
     plot_fft_comparison(analysis_data)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
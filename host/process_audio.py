@@ -4,35 +4,83 @@ from aec_project.audio_generator import SignalGenerator
 from aec_project.audio_processor import VSTProcessor, HarmonicProcessor, get_channev_neutral_params
 from aec_project.signal_analyzer import SignalAnalyzer
 from aec_project.data_handler import DataHandler
+from aec_project.results_catalog import ResultsCatalog
+from aec_project.render_cache import RenderCache, plugin_identity
 
 # --- Configuration ---
 DURATION = 2.0
 SAMPLE_RATE = 44100
 FREQUENCY = 500  # Hz (A4)
+AMPLITUDE = 0.5
+CHANNELS = 2
+PLOT_BANDS = 2048
 PLUGIN_PATH = "./vst/CHANNEV.vst3"
 OUTPUT_FILE = "analysis_results.npz"
+CATALOG_DIR = "results_catalog"
+CACHE_DIR = ".render_cache"
+CACHE_MAX_BYTES = 2 * 2 ** 30
 
 def main():
     """Main processing pipeline."""
+    # Every stage is skipped when its output for the same settings and
+    # inputs is already in the render cache.
+    cache = RenderCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+
     # 1. Generate Audio
     generator = SignalGenerator(duration=DURATION, sample_rate=SAMPLE_RATE)
-    original_audio = generator.generate_sine(frequency=FREQUENCY)
+    original_audio, sine_key = cache.cached(
+        "generate_sine",
+        {'duration': DURATION, 'sample_rate': SAMPLE_RATE, 'frequency': FREQUENCY,
+         'amplitude': AMPLITUDE, 'channels': CHANNELS},
+        lambda: generator.generate_sine(frequency=FREQUENCY, amplitude=AMPLITUDE, channels=CHANNELS),
+    )
 
     # 2. Process Audio with VST
-    vst_processor = VSTProcessor(plugin_path=PLUGIN_PATH)
     neutral_params = get_channev_neutral_params()
-    vst_processor.set_parameters(neutral_params)
-    effected_audio = vst_processor.process(original_audio, SAMPLE_RATE)
+
+    def render_vst():
+        with VSTProcessor(plugin_path=PLUGIN_PATH) as vst_processor:
+            vst_processor.set_parameters(neutral_params)
+            return vst_processor.process(original_audio, SAMPLE_RATE)
+
+    effected_audio, vst_key = cache.cached(
+        "vst_process",
+        {'plugin': plugin_identity(PLUGIN_PATH), 'params': neutral_params, 'sample_rate': SAMPLE_RATE},
+        render_vst,
+        depends_on=[sine_key],
+    )
     
     # 3. Process Audio with Custom Harmonics
     harmonic_processor = HarmonicProcessor(tanh_amount=1.0, tanh_bias=-0.5,cubic_amount=0.0, fullrect_amount=0.0, asym_clip_amount=0.02)
-    harmonic_audio = harmonic_processor.process(original_audio, SAMPLE_RATE)
+    harmonic_audio, harmonic_key = cache.cached(
+        "harmonic_process",
+        {**harmonic_processor.settings(), 'sample_rate': SAMPLE_RATE},
+        lambda: harmonic_processor.process(original_audio, SAMPLE_RATE),
+        depends_on=[sine_key],
+    )
 
     # 4. Analyze Signals
+    # All three signals share one length, so they go through a single FFT call.
+    # Only a log-band peak spectrum is kept for the plots; the measurements
+    # below carry the harmonic levels.
     analyzer = SignalAnalyzer()
-    freq_axis, orig_fft = analyzer.compute_fft(original_audio, SAMPLE_RATE)
-    _, effected_fft = analyzer.compute_fft(effected_audio, SAMPLE_RATE)
-    _, harm_fft = analyzer.compute_fft(harmonic_audio, SAMPLE_RATE)
+
+    def plot_spectra():
+        frequencies, spectra = analyzer.compute_spectra([original_audio, effected_audio, harmonic_audio], SAMPLE_RATE)
+        return analyzer.decimate_spectrum(frequencies, spectra[:, :, 0], PLOT_BANDS)
+
+    (freq_axis, spectra), _ = cache.cached(
+        "plot_spectra",
+        {'sample_rate': SAMPLE_RATE, 'bands': PLOT_BANDS},
+        plot_spectra,
+        depends_on=[sine_key, vst_key, harmonic_key],
+    )
+    orig_fft, effected_fft, harm_fft = spectra
+
+    # Harmonic levels, THD and THD+N only need the bins at k * FREQUENCY
+    measurements = {}
+    for prefix, audio in (("original_", original_audio), ("effected_vst_", effected_audio), ("effected_harm_", harmonic_audio)):
+        measurements.update(analyzer.measure_harmonics(audio, SAMPLE_RATE, FREQUENCY).to_arrays(prefix))
 
     # 5. Save Data for Later Use
     handler = DataHandler()
@@ -42,7 +90,19 @@ def main():
         effected_harm_fft=harm_fft,
         effected_vst_fft=effected_fft,
         original_fft=orig_fft,
+        **measurements,
     )
 
+    # 6. Record the run in the results catalog, queryable by its parameters
+    with ResultsCatalog(CATALOG_DIR) as catalog:
+        run_id = catalog.add_run(
+            signal="sine",
+            frequency=FREQUENCY,
+            plugin=PLUGIN_PATH,
+            params={**harmonic_processor.params, 'duration': DURATION, 'sample_rate': SAMPLE_RATE},
+            arrays=measurements,
+        )
+    print(f"Run {run_id} recorded in {CATALOG_DIR}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+
+# Tests run from the host directory; filtres lives at the repository root.
+HOST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (HOST_DIR, os.path.dirname(HOST_DIR)):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,22 @@
+# tests/test_audio_generator.py
+# Run from the host directory: python -m pytest tests
+import numpy as np
+import pytest
+
+from aec_project.audio_generator import SignalGenerator
+
+@pytest.mark.parametrize("method, args", [
+    ("generate_sine", (1000.0,)),
+    ("generate_multitone", ([100.0, 1000.0],)),
+    ("generate_log_sweep", (20.0, 20000.0)),
+    ("generate_noise", ()),
+    ("generate_impulse", ()),
+])
+def test_signals_are_new_writable_arrays(method, args):
+    generator = SignalGenerator(duration=0.1, sample_rate=48000)
+    signal = getattr(generator, method)(*args)
+    assert signal.shape == (generator.num_samples, 2)
+    signal *= 0.5
+    assert signal.flags.c_contiguous
+    again = getattr(generator, method)(*args)
+    assert not np.shares_memory(signal, again)
@@ -0,0 +1,53 @@
+# tests/test_audio_io.py
+# Run from the host directory: python -m pytest tests
+import itertools
+
+import numpy as np
+import pytest
+
+soundfile = pytest.importorskip("soundfile")
+
+from aec_project.audio_io import AudioReader, AudioWriter
+
+@pytest.fixture
+def sine_file(tmp_path):
+    sample_rate = 44100
+    t = np.arange(sample_rate) / sample_rate
+    audio = np.stack([0.5 * np.sin(2 * np.pi * 440 * t), 0.25 * np.sin(2 * np.pi * 1000 * t)], axis=-1)
+    path = str(tmp_path / "sine.wav")
+    soundfile.write(path, audio, sample_rate, subtype='FLOAT')
+    return path, audio.astype(np.float32), sample_rate
+
+@pytest.mark.parametrize("sample_rate, block_size", [
+    (None, 128), (None, 4096), (48000, 128), (48000, 1000), (96000, 300),
+    (96000, 65536), (22050, 128), (32000, 777),
+])
+def test_block_lengths_sum_to_frames(sine_file, sample_rate, block_size):
+    path, _, _ = sine_file
+    with AudioReader(path, block_size, sample_rate) as reader:
+        # islice bounds the loop, so a reader that never ends fails instead of hanging
+        limit = reader.frames // block_size + 2
+        lengths = [len(block) for block in itertools.islice(reader.blocks(), limit)]
+        assert sum(lengths) == reader.frames
+        assert all(length == block_size for length in lengths[:-1])
+        assert 0 < lengths[-1] <= block_size
+
+def test_resampled_blocks_stay_aligned_with_the_file(sine_file):
+    path, audio, source_rate = sine_file
+    with AudioReader(path, 1000, 48000) as reader:
+        resampled = np.concatenate([block.copy() for block in reader])
+    t = np.arange(len(resampled)) / 48000
+    expected = np.stack([0.5 * np.sin(2 * np.pi * 440 * t), 0.25 * np.sin(2 * np.pi * 1000 * t)], axis=-1)
+    # Away from the edges, where the filter sees the zeros outside the file
+    np.testing.assert_allclose(resampled[500:-500], expected[500:-500], atol=1e-3)
+
+def test_writer_round_trip(sine_file, tmp_path):
+    path, audio, sample_rate = sine_file
+    output_path = str(tmp_path / "copy.wav")
+    with AudioReader(path, 1000) as reader:
+        with AudioWriter(output_path, reader.samplerate, reader.channels, 'FLOAT') as writer:
+            for block in reader:
+                writer.write(block)
+    copied, copied_rate = soundfile.read(output_path, dtype='float32')
+    assert copied_rate == sample_rate
+    np.testing.assert_array_equal(copied, audio)
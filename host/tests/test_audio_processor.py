@@ -0,0 +1,53 @@
+# tests/test_audio_processor.py
+# Run from the host directory: python -m pytest tests
+import numpy as np
+import pytest
+
+from aec_project.audio_processor import VSTProcessor
+
+class RunningSumBoard:
+    """A stateful stand-in for a pedalboard board: the output is the running sum of the input."""
+    def __init__(self):
+        self.state = None
+        self.chunks = []
+
+    def reset(self):
+        self.state = None
+
+    def __call__(self, audio, sample_rate, reset=True):
+        assert audio.ndim == 2 and len(audio) > audio.shape[1], "ambiguous channel layout"
+        self.chunks.append(len(audio))
+        if self.state is None:
+            self.state = np.zeros(audio.shape[1])
+        out = self.state + np.cumsum(audio, axis=0)
+        self.state = out[-1]
+        return out
+
+def _processor():
+    processor = VSTProcessor.__new__(VSTProcessor)
+    processor.board = RunningSumBoard()
+    return processor
+
+@pytest.mark.parametrize("lengths", [
+    [1000, 1, 1000], [2, 2, 2, 2, 2], [1000, 2], [1, 1, 1, 500, 3], [0, 3, 1000, 0, 1],
+])
+def test_short_blocks_are_merged_not_padded(lengths):
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal((sum(lengths), 2))
+    bounds = np.cumsum([0] + lengths)
+    # Reuse one buffer, as AudioReader does, to catch blocks kept by reference
+    buffer = np.empty((max(lengths), 2))
+
+    def blocks():
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            buffer[:stop - start] = audio[start:stop]
+            yield buffer[:stop - start]
+
+    processor = _processor()
+    output = np.concatenate(list(processor.process_stream(blocks(), 48000)))
+    np.testing.assert_allclose(output, np.cumsum(audio, axis=0))
+    assert sum(processor.board.chunks) == len(audio)
+
+def test_stream_no_longer_than_its_channel_count_is_rejected():
+    with pytest.raises(ValueError):
+        list(_processor().process_stream([np.ones((2, 2))], 48000))
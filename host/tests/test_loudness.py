@@ -0,0 +1,43 @@
+# tests/test_loudness.py
+# Run from the host directory: python -m pytest tests
+import numpy as np
+import pytest
+
+from aec_project.loudness import LoudnessMeasurement, LoudnessMeter
+from aec_project.signal_analyzer import SignalAnalyzer
+
+def _sine(sample_rate, seconds, frequency=997.0, amplitude=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+@pytest.mark.parametrize("sample_rate", [44100, 48000])
+def test_full_scale_sine_on_one_channel_reads_minus_3_lufs(sample_rate):
+    audio = np.zeros((sample_rate * 5, 2), dtype=np.float32)
+    audio[:, 0] = _sine(sample_rate, 5)
+    measurement = SignalAnalyzer.measure_loudness(audio, sample_rate)
+    assert measurement.integrated == pytest.approx(-3.01, abs=0.05)
+    assert measurement.max_short_term == pytest.approx(-3.01, abs=0.05)
+    assert measurement.crest_factor_db()[0] == pytest.approx(3.01, abs=0.01)
+    assert measurement.true_peak_db()[0] == pytest.approx(0.0, abs=0.1)
+
+def test_result_does_not_depend_on_block_size():
+    sample_rate = 48000
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal((sample_rate * 4, 2))).astype(np.float32)
+    reference = SignalAnalyzer.measure_loudness(audio, sample_rate, block_size=65536)
+    for block_size in (100, 4800, 12345):
+        measurement = SignalAnalyzer.measure_loudness(audio, sample_rate, block_size=block_size)
+        assert measurement.integrated == pytest.approx(reference.integrated, abs=1e-6)
+        np.testing.assert_allclose(measurement.momentary, reference.momentary, atol=1e-6)
+        np.testing.assert_allclose(measurement.true_peak, reference.true_peak, rtol=1e-6)
+
+def test_silence_is_gated_out():
+    meter = LoudnessMeter(48000, 2)
+    meter.process(np.zeros((48000, 2), dtype=np.float32))
+    assert meter.result().integrated == -np.inf
+
+def test_combined_loudness_of_equal_tracks_matches_each_track():
+    sample_rate = 48000
+    track = _sine(sample_rate, 3, amplitude=0.5)
+    measurements = [SignalAnalyzer.measure_loudness(track, sample_rate) for _ in range(3)]
+    assert LoudnessMeasurement.combine(measurements) == pytest.approx(measurements[0].integrated, abs=1e-6)
@@ -0,0 +1,26 @@
+# tests/test_render_cache.py
+# Run from the host directory: python -m pytest tests
+import numpy as np
+
+from aec_project.render_cache import RenderCache
+
+def test_hit_and_miss_return_the_same_kind_of_array(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    mono = np.arange(8, dtype=np.float32)
+    view = np.broadcast_to(mono[:, np.newaxis], (8, 2))
+    missed, key = cache.cached("stage", {'a': 1}, lambda: view)
+    hit, hit_key = cache.cached("stage", {'a': 1}, lambda: None)
+    assert key == hit_key
+    for value in (missed, hit):
+        assert value.flags.writeable and value.flags.c_contiguous
+        np.testing.assert_array_equal(value, view)
+
+def test_tuples_are_normalised_too(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    frozen = np.zeros(4)
+    frozen.flags.writeable = False
+    missed, _ = cache.cached("stage", {}, lambda: (frozen, np.ones((3, 2)).T))
+    hit, _ = cache.cached("stage", {}, lambda: None)
+    for value in (missed, hit):
+        assert isinstance(value, tuple)
+        assert all(item.flags.writeable and item.flags.c_contiguous for item in value)
@@ -0,0 +1,37 @@
+# tests/test_render_service.py
+# Run from the host directory: python -m pytest tests
+import asyncio
+import os
+
+import pytest
+
+from aec_project.render_service import RenderService, confine_job
+
+def test_confine_job_resolves_paths_inside_the_root(tmp_path):
+    root = os.path.realpath(tmp_path)
+    job = confine_job({'input': 'in.wav', 'output_path': 'out/result.wav',
+                       'chain': [{'type': 'vst', 'plugin_path': 'vst/CHANNEV.vst3'}]}, root)
+    assert job['input'] == os.path.join(root, 'in.wav')
+    assert job['output_path'] == os.path.join(root, 'out', 'result.wav')
+    assert job['chain'][0]['plugin_path'] == os.path.join(root, 'vst', 'CHANNEV.vst3')
+
+@pytest.mark.parametrize("job", [
+    {'input': '/etc/passwd'},
+    {'input': '../outside.wav'},
+    {'input': {'type': 'sine', 'duration': 1.0, 'frequency': 500}, 'output_path': '../../escape.wav'},
+    {'input': 'in.wav', 'chain': [{'type': 'vst', 'plugin_path': '/tmp/evil.vst3'}]},
+    {'input': 'in.wav', 'chain': [{'type': 'save', 'path': '../results.npz'}]},
+])
+def test_confine_job_rejects_paths_outside_the_root(tmp_path, job):
+    with pytest.raises(PermissionError):
+        confine_job(job, str(tmp_path))
+
+def test_confine_job_rejects_symlinks_out_of_the_root(tmp_path):
+    (tmp_path / 'link').symlink_to('/etc')
+    with pytest.raises(PermissionError):
+        confine_job({'input': 'link/passwd'}, str(tmp_path))
+
+def test_tcp_listener_must_be_loopback():
+    service = RenderService.__new__(RenderService)
+    with pytest.raises(ValueError):
+        asyncio.run(service.start(host='0.0.0.0', port=0))
@@ -0,0 +1,36 @@
+# tests/test_signal_analyzer.py
+# Run from the host directory: python -m pytest tests
+import numpy as np
+import pytest
+
+from aec_project.audio_generator import SignalGenerator
+from aec_project.signal_analyzer import SignalAnalyzer
+
+def test_harmonic_responses_are_on_the_input_frequency_axis():
+    from scipy.signal import butter, sosfilt, sosfreqz
+    sample_rate, duration, f_start, f_end = 48000, 5.0, 50.0, 20000.0
+    sweep = SignalGenerator(duration, sample_rate).generate_log_sweep(
+        f_start, f_end, amplitude=1.0, channels=1, synchronized=True)
+    lowpass = butter(2, 1000, fs=sample_rate, output='sos')
+    # Cubing a sine of amplitude g gives a third harmonic of amplitude g**3 / 4
+    response = sosfilt(lowpass, sweep) ** 3
+
+    impulse_response = SignalAnalyzer.deconvolve_sweep(response, sweep, sample_rate, f_start, f_end)
+    irs = SignalAnalyzer.extract_harmonic_irs(impulse_response, sample_rate, duration, f_start, f_end, orders=3)
+    frequencies, responses = SignalAnalyzer.harmonic_responses(irs, sample_rate)
+
+    for frequency in (200.0, 500.0, 1000.0):
+        index = np.argmin(np.abs(frequencies - frequency))
+        _, gain = sosfreqz(lowpass, worN=[frequencies[index]], fs=sample_rate)
+        assert responses[3][index] == pytest.approx(np.abs(gain[0]) ** 3 / 4, rel=0.05)
+    assert np.isnan(responses[3][frequencies > sample_rate / 6]).all()
+
+def test_decimated_spectrum_keeps_harmonic_peaks():
+    sample_rate = 44100
+    signal = SignalGenerator(2.0, sample_rate).generate_multitone([500.0, 1000.0, 1500.0], [0.5, 0.05, 0.005])
+    frequencies, spectra = SignalAnalyzer.compute_spectra([signal], sample_rate)
+    bands, peaks = SignalAnalyzer.decimate_spectrum(frequencies, spectra[:, :, 0], num_bands=2048)
+    assert peaks.shape[1] == len(bands) <= 2048
+    for harmonic in (500.0, 1000.0, 1500.0):
+        band = np.argmin(np.abs(bands - harmonic))
+        assert peaks[0, band] == spectra[0, np.argmin(np.abs(frequencies - harmonic)), 0]